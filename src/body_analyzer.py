@@ -9,45 +9,154 @@ import numpy as np
 import math
 from datetime import datetime
 import os
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+from body_analyzer_kernels import Keypoints, validity_mask, analysis_kernel
+
+# Make onnxruntime optional
+try:
+    import onnxruntime as ort
+    ORT_AVAILABLE = True
+except ImportError:
+    ORT_AVAILABLE = False
+
+
+# Side length of the square pose network input
+POSE_INPUT_SIZE = 368
+
+# Side length of the gray thumbnail used to detect unchanged frames
+CHANGE_THUMB_SIZE = 64
+
+# Frame-change threshold used when analyzing a video stream
+STREAM_CHANGE_THRESHOLD = 2.0
+
+
+# Body section ratios for health analysis
+IDEAL_RATIOS = MappingProxyType({
+    'shoulder_hip_ratio': 1.618,  # Golden ratio for masculine builds
+    'waist_hip_ratio': 0.7,       # Healthy female waist-hip ratio
+    'leg_torso_ratio': 1.4        # Ideal leg to torso proportion
+})
+
+# Health metrics thresholds
+HEALTH_THRESHOLDS = MappingProxyType({
+    'posture_angle': MappingProxyType({
+        'excellent': 5.0,   # Deviation in degrees from vertical
+        'good': 10.0,
+        'fair': 15.0,
+        'poor': 20.0
+    }),
+    'shoulder_symmetry': MappingProxyType({
+        'excellent': 0.95,  # Shoulder level symmetry (0-1)
+        'good': 0.9,
+        'fair': 0.8,
+        'poor': 0.7
+    }),
+    'weight_distribution': MappingProxyType({
+        'excellent': 0.9,   # Balance between left/right (0-1)
+        'good': 0.85,
+        'fair': 0.75,
+        'poor': 0.6
+    })
+})
+
+# Skeleton edges drawn between keypoint indices
+_CONNECTIONS = np.array([
+    [0, 1],    # Nose to Neck
+    [1, 2],    # Neck to Left Shoulder
+    [1, 3],    # Neck to Right Shoulder
+    [2, 4],    # Left Shoulder to Left Elbow
+    [3, 5],    # Right Shoulder to Right Elbow
+    [4, 6],    # Left Elbow to Left Wrist
+    [5, 7],    # Right Elbow to Right Wrist
+    [1, 8],    # Neck to Torso
+    [8, 9],    # Torso to Left Hip
+    [8, 10],   # Torso to Right Hip
+    [9, 11],   # Left Hip to Left Knee
+    [10, 12],  # Right Hip to Right Knee
+    [11, 13],  # Left Knee to Left Ankle
+    [12, 14],  # Right Knee to Right Ankle
+], dtype=np.int32)
+
+
+def _nan_to_none(value):
+    """Map a kernel's NaN "not available" marker back to None"""
+    return None if math.isnan(value) else float(value)
+
 
 class BodyAnalyzer:
     """Analyzes body posture, proportions, and health indicators"""
     
-    def __init__(self, use_gpu=True):
-        """Initialize the body analyzer"""
+    # Read-only reference values shared by all instances
+    ideal_ratios = IDEAL_RATIOS
+    health_thresholds = HEALTH_THRESHOLDS
+    
+    # Sorted threshold vectors for branchless grading with searchsorted.
+    # Kept in float64 so boundary values compare exactly as before.
+    _POSTURE_THRESH = np.array([
+        HEALTH_THRESHOLDS['posture_angle']['excellent'],
+        HEALTH_THRESHOLDS['posture_angle']['good'],
+        HEALTH_THRESHOLDS['posture_angle']['fair'],
+        HEALTH_THRESHOLDS['posture_angle']['poor']
+    ])
+    _POSTURE_GRADES = (
+        ("Excellent", "Great vertical alignment"),
+        ("Good", "Good posture with slight deviation"),
+        ("Fair", "Moderate posture issues observed"),
+        ("Concerning", "Significant posture deviation detected"),
+        ("Concerning", "Significant posture deviation detected")
+    )
+    _BALANCE_THRESH = np.array([
+        HEALTH_THRESHOLDS['weight_distribution']['poor'],
+        HEALTH_THRESHOLDS['weight_distribution']['fair'],
+        HEALTH_THRESHOLDS['weight_distribution']['good'],
+        HEALTH_THRESHOLDS['weight_distribution']['excellent']
+    ])
+    _BALANCE_GRADES = (
+        ("Concerning", "Weight distribution imbalance detected"),
+        ("Concerning", "Weight distribution imbalance detected"),
+        ("Fair", "Fair weight distribution, slight imbalance"),
+        ("Good", "Good weight distribution"),
+        ("Excellent", "Excellent weight distribution and balance")
+    )
+    
+    def __init__(self, use_gpu=True, change_threshold=0):
+        """
+        Initialize the body analyzer
+        
+        Args:
+            use_gpu: Whether to run the pose network on the GPU
+            change_threshold: Mean gray-level difference (0-255) between a frame
+                and the last inferred one below which cached keypoints are reused;
+                0 (the default) disables the cache, which only suits video streams
+        """
         self.use_gpu = use_gpu
+        self.change_threshold = change_threshold
         self.pose_net = None
+        self._ort_session = None
+        self._ort_binding = None
+        self._ort_input = None
         self.initialized = False
-        self._init_pose_model()
+        self._blob = None
+        self._resized = None
         
-        # Body section ratios for health analysis
-        self.ideal_ratios = {
-            'shoulder_hip_ratio': 1.618,  # Golden ratio for masculine builds
-            'waist_hip_ratio': 0.7,       # Healthy female waist-hip ratio
-            'leg_torso_ratio': 1.4        # Ideal leg to torso proportion
-        }
+        # Change-based inference cache: thumbnail of the last inferred frame
+        self._last_frame_ds = None
+        self._last_frame_shape = None
+        self._last_keypoints = None
         
-        # Health metrics thresholds
-        self.health_thresholds = {
-            'posture_angle': {
-                'excellent': 5.0,   # Deviation in degrees from vertical
-                'good': 10.0,
-                'fair': 15.0,
-                'poor': 20.0
-            },
-            'shoulder_symmetry': {
-                'excellent': 0.95,  # Shoulder level symmetry (0-1)
-                'good': 0.9,
-                'fair': 0.8,
-                'poor': 0.7
-            },
-            'weight_distribution': {
-                'excellent': 0.9,   # Balance between left/right (0-1)
-                'good': 0.85,
-                'fair': 0.75,
-                'poor': 0.6
-            }
-        }
+        # Fallback detector work buffers, reallocated when the frame size changes
+        self._gray_buf = None
+        self._thresh_buf = None
+        self._gpu_frame = None
+        
+        # Single worker that owns pose inference for the asynchronous API
+        self._pose_executor = None
+        
+        self._init_pose_model()
+        if not self.initialized:
+            self._init_gpu_fallback()
     
     def _init_pose_model(self):
         """Initialize the body pose estimation model"""
@@ -59,6 +168,11 @@ class BodyAnalyzer:
             # Check for model files
             model_path = os.path.join(model_dir, "pose_model.pb")
             config_path = os.path.join(model_dir, "pose_model.pbtxt")
+            onnx_path = os.path.join(model_dir, "pose_model.onnx")
+            
+            # Prefer an ONNX export run through ONNX Runtime
+            if ORT_AVAILABLE and os.path.exists(onnx_path) and self._init_onnx_model(onnx_path):
+                return
             
             # If the models don't exist, print a message and use fallback mode
             if not (os.path.exists(model_path) and os.path.exists(config_path)):
@@ -75,8 +189,13 @@ class BodyAnalyzer:
                 # Use GPU if available
                 if self.use_gpu:
                     self.pose_net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-                    self.pose_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+                    # Half precision runs on tensor cores; older builds/GPUs lack it
+                    try:
+                        self.pose_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA_FP16)
+                    except Exception:
+                        self.pose_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
                 
+                self._alloc_input_buffers()
                 self.initialized = True
                 print("Body pose estimation model loaded successfully")
             except Exception as e:
@@ -86,42 +205,113 @@ class BodyAnalyzer:
             print(f"Error initializing body analyzer: {e}")
             print("Body analysis will use simplified methods")
     
-    def detect_pose(self, image):
+    def _init_onnx_model(self, onnx_path):
+        """
+        Load the pose model with ONNX Runtime
+        
+        The model is expected to be exported from pose_model.pb with tf2onnx
+        using --inputs-as-nchw and --outputs-as-nchw, so it takes and returns
+        the same NCHW tensors as the cv2.dnn network.
+        
+        Returns:
+            True if the session was created
+        """
+        if self.use_gpu:
+            providers = [
+                ('TensorrtExecutionProvider', {'trt_fp16_enable': True}),
+                'CUDAExecutionProvider',
+                'CPUExecutionProvider'
+            ]
+        else:
+            providers = ['CPUExecutionProvider']
+        available = ort.get_available_providers()
+        providers = [p for p in providers if (p[0] if isinstance(p, tuple) else p) in available]
+        
+        try:
+            session = ort.InferenceSession(onnx_path, providers=providers)
+        except Exception as e:
+            print(f"ONNX Runtime pose model initialization failed: {e}")
+            return False
+        
+        self._ort_session = session
+        self._ort_input = session.get_inputs()[0].name
+        self._ort_device = 'cpu' if session.get_providers()[0] == 'CPUExecutionProvider' else 'cuda'
+        
+        # The input tensor stays bound on the device and is refreshed in place
+        self._ort_binding = session.io_binding()
+        self._ort_binding.bind_output(session.get_outputs()[0].name, 'cpu')
+        self._ort_value = None
+        
+        self._alloc_input_buffers()
+        self.initialized = True
+        print(f"Body pose estimation model loaded with ONNX Runtime ({session.get_providers()[0]})")
+        return True
+    
+    def _alloc_input_buffers(self):
+        """Allocate the reusable network input buffers, grown on demand for batches"""
+        self._blob = np.empty((1, 3, POSE_INPUT_SIZE, POSE_INPUT_SIZE), dtype=np.float32)
+        self._resized = np.empty((POSE_INPUT_SIZE, POSE_INPUT_SIZE, 3), dtype=np.uint8)
+    
+    def _forward(self, blob):
+        """Run the pose network on an NCHW blob and return the heatmap tensor"""
+        if self._ort_session is None:
+            self.pose_net.setInput(blob)
+            return self.pose_net.forward()
+        
+        if self._ort_value is None or self._ort_value.shape() != list(blob.shape):
+            self._ort_value = ort.OrtValue.ortvalue_from_numpy(blob, self._ort_device, 0)
+            self._ort_binding.bind_ortvalue_input(self._ort_input, self._ort_value)
+        else:
+            self._ort_value.update_inplace(blob)
+        self._ort_session.run_with_iobinding(self._ort_binding)
+        return self._ort_binding.copy_outputs_to_cpu()[0]
+    
+    def _init_gpu_fallback(self):
+        """Keep the fallback detector's frames on the GPU when OpenCV has CUDA"""
+        if not self.use_gpu:
+            return
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                self._gpu_frame = cv2.cuda_GpuMat()
+                print("Fallback body detection using CUDA")
+        except (AttributeError, cv2.error):
+            self._gpu_frame = None
+    
+    def detect_pose(self, image, change_threshold=None):
         """
         Detect body pose keypoints from an image
         
         Args:
             image: Input image with person's body
+            change_threshold: Overrides the instance's frame-change threshold
             
         Returns:
-            List of body keypoints (joints)
+            Keypoints of the body joints, or None if no body was found
         """
-        if self.initialized and self.pose_net:
-            # Process with OpenCV DNN
-            frame_height, frame_width = image.shape[:2]
-            
-            # Prepare the input blob and perform inference
-            blob = cv2.dnn.blobFromImage(image, 1.0/255, (368, 368), (0, 0, 0), swapRB=True, crop=False)
-            self.pose_net.setInput(blob)
-            output = self.pose_net.forward()
-            
-            # The output is a 4D matrix
-            # We extract heatmaps for each body part
-            keypoints = []
-            threshold = 0.2  # Confidence threshold
-            
-            # Maps correspond to body parts (OpenPose COCO model)
-            for i in range(18):  # COCO model has 18 keypoints
-                probMap = output[0, i, :, :]
-                probMap = cv2.resize(probMap, (frame_width, frame_height))
-                
-                minVal, prob, minLoc, point = cv2.minMaxLoc(probMap)
-                
-                if prob > threshold:
-                    keypoints.append((int(point[0]), int(point[1]), prob))
-                else:
-                    keypoints.append(None)
-            
+        if change_threshold is None:
+            change_threshold = self.change_threshold
+        
+        if self.initialized:
+            # Near-identical consecutive frames reuse the previous keypoints
+            if change_threshold > 0:
+                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                frame_ds = cv2.resize(gray, (CHANGE_THUMB_SIZE, CHANGE_THUMB_SIZE),
+                                      interpolation=cv2.INTER_AREA)
+                if (self._last_frame_ds is not None
+                        and self._last_frame_shape == image.shape
+                        and cv2.absdiff(frame_ds, self._last_frame_ds).mean() < change_threshold):
+                    return self._last_keypoints
+            
+            # Single frames go through the batch path with N=1
+            keypoints = self.detect_pose_batch([image])[0]
+            
+            if change_threshold > 0:
+                self._last_frame_ds = frame_ds
+                self._last_frame_shape = image.shape
+                self._last_keypoints = keypoints
+            else:
+                # An uncached call breaks the run of consecutive frames
+                self._last_frame_ds = None
             return keypoints
         else:
             # Fallback method - simplified body detection
@@ -129,14 +319,29 @@ class BodyAnalyzer:
             frame_height, frame_width = image.shape[:2]
             
             # Detect general body shape using contours
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            blur = cv2.GaussianBlur(gray, (5, 5), 0)
-            _, thresh = cv2.threshold(blur, 20, 255, cv2.THRESH_BINARY)
+            if self._gray_buf is None or self._gray_buf.shape != (frame_height, frame_width):
+                self._gray_buf = np.empty((frame_height, frame_width), dtype=np.uint8)
+                self._thresh_buf = np.empty_like(self._gray_buf)
+            if self._gpu_frame is not None:
+                # Color conversion and threshold on the GPU; only the binary mask
+                # comes back, since findContours has no CUDA implementation
+                self._gpu_frame.upload(image)
+                gpu_gray = cv2.cuda.cvtColor(self._gpu_frame, cv2.COLOR_BGR2GRAY)
+                _, gpu_thresh = cv2.cuda.threshold(gpu_gray, 20, 255, cv2.THRESH_BINARY)
+                thresh = gpu_thresh.download(self._thresh_buf)
+            else:
+                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
+                _, thresh = cv2.threshold(gray, 20, 255, cv2.THRESH_BINARY, dst=self._thresh_buf)
             
-            contours, _ = cv2.findContours(thresh, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+            # Only the outer outline matters, so skip building the hierarchy
+            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
             # Find the largest contour (assumed to be the body)
-            max_contour = max(contours, key=cv2.contourArea, default=None)
+            max_contour = None
+            if contours:
+                areas = np.fromiter((cv2.contourArea(c) for c in contours),
+                                    dtype=np.float32, count=len(contours))
+                max_contour = contours[int(areas.argmax())]
             
             if max_contour is not None:
                 # Create simulated keypoints based on contour
@@ -161,18 +366,139 @@ class BodyAnalyzer:
                     (x + 2*w//3, y + h, 0.6)           # Right ankle
                 ]
                 
-                return keypoints
+                return Keypoints.from_list(keypoints)
             else:
                 print("No body contour detected")
                 return None
     
+    def detect_pose_batch(self, images):
+        """
+        Detect body pose keypoints for several frames with a single forward pass
+        
+        Args:
+            images: List of input images (BGR)
+            
+        Returns:
+            List with one Keypoints entry per input image
+        """
+        if not self.initialized:
+            return [self.detect_pose(image) for image in images]
+        
+        # One 4D blob for the whole batch so the network runs once per call
+        output = self._forward(self._fill_blob(images))
+        
+        # The output is a 4D matrix (N, parts, H, W) of heatmaps
+        # Maps correspond to body parts (OpenPose COCO model, 18 keypoints)
+        heatmaps = output[:, :18]
+        heatmap_height, heatmap_width = heatmaps.shape[2:4]
+        threshold = 0.2  # Confidence threshold
+        
+        # Argmax is scale-invariant, so locate peaks on the raw heatmaps
+        flat = heatmaps.reshape(len(images), 18, -1)
+        flat_idx = flat.argmax(axis=2)
+        probs = np.take_along_axis(flat, flat_idx[..., None], axis=2)[..., 0]
+        ys, xs = np.divmod(flat_idx, heatmap_width)
+        
+        # Missing keypoints get zero confidence
+        conf = np.where(probs > threshold, probs, 0).astype(np.float64)
+        
+        batch_keypoints = []
+        for n, image in enumerate(images):
+            frame_height, frame_width = image.shape[:2]
+            
+            # Scale heatmap coordinates to the frame
+            batch_keypoints.append(Keypoints(
+                np.trunc(xs[n] * (frame_width / heatmap_width)),
+                np.trunc(ys[n] * (frame_height / heatmap_height)),
+                conf[n]
+            ))
+        
+        return batch_keypoints
+    
+    def _fill_blob(self, images):
+        """
+        Write images into the persistent NCHW input blob
+        
+        Equivalent to cv2.dnn.blobFromImages(images, 1/255, (368, 368),
+        swapRB=True) without allocating a new blob for every call. Images
+        that are not 3-channel uint8 make resize allocate a new array instead
+        of filling the buffer, so they take the regular path.
+        """
+        if self._blob.shape[0] != len(images):
+            self._blob = np.empty((len(images), 3, POSE_INPUT_SIZE, POSE_INPUT_SIZE), dtype=np.float32)
+        
+        for n, image in enumerate(images):
+            resized = cv2.resize(image, (POSE_INPUT_SIZE, POSE_INPUT_SIZE), dst=self._resized)
+            if resized is not self._resized:
+                return cv2.dnn.blobFromImages(images, 1.0/255, (POSE_INPUT_SIZE, POSE_INPUT_SIZE),
+                                              (0, 0, 0), swapRB=True, crop=False)
+            # BGR -> RGB and HWC -> CHW, scaled to 0-1
+            np.multiply(resized[:, :, ::-1].transpose(2, 0, 1), 1.0/255, out=self._blob[n])
+        
+        return self._blob
+    
+    def detect_pose_async(self, image, change_threshold=None):
+        """
+        Start pose detection on a background thread
+        
+        The network forward pass releases the GIL, so the caller can keep
+        analyzing the previous frame while this one is inferred. Do not mix
+        with synchronous detect_pose calls while a detection is pending.
+        
+        Args:
+            image: Input image with person's body
+            change_threshold: Overrides the instance's frame-change threshold
+            
+        Returns:
+            concurrent.futures.Future resolving to the detect_pose result
+        """
+        if self._pose_executor is None:
+            self._pose_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pose")
+        return self._pose_executor.submit(self.detect_pose, image, change_threshold)
+    
+    def analyze_stream(self, frames, change_threshold=STREAM_CHANGE_THRESHOLD):
+        """
+        Analyze a sequence of frames, detecting frame t while analyzing frame t-1
+        
+        Args:
+            frames: Iterable of input images
+            change_threshold: Frame-change threshold below which consecutive
+                frames reuse the previous keypoints; 0 disables the cache
+            
+        Yields:
+            (frame, analysis result) tuples in input order
+        """
+        pending = None
+        for frame in frames:
+            future = self.detect_pose_async(frame, change_threshold)
+            if pending is not None:
+                yield self._finish_pending(*pending)
+            pending = (frame, future)
+        
+        if pending is not None:
+            yield self._finish_pending(*pending)
+    
+    def _finish_pending(self, frame, future):
+        """Wait for a pending detection and analyze its frame"""
+        keypoints = future.result()
+        if keypoints is None:
+            return frame, {"error": "No body detected or poor image quality"}
+        return frame, self.analyze(frame, keypoints)
+    
+    def close(self):
+        """Stop the background pose detection worker"""
+        if self._pose_executor is not None:
+            self._pose_executor.shutdown(wait=True)
+            self._pose_executor = None
+    
     def analyze(self, image, keypoints=None):
         """
         Analyze body for health indicators
         
         Args:
             image: Input image with person's body
-            keypoints: Pre-detected body keypoints (optional)
+            keypoints: Pre-detected body keypoints (optional), as Keypoints
+                or a list of (x, y, confidence) tuples
             
         Returns:
             Dictionary with body health analysis
@@ -180,39 +506,54 @@ class BodyAnalyzer:
         if keypoints is None:
             keypoints = self.detect_pose(image)
             
-        if not keypoints:
+        if keypoints is None:
+            return {"error": "No body detected or poor image quality"}
+        if not isinstance(keypoints, Keypoints):
+            keypoints = Keypoints.from_list(keypoints)
+        
+        # Single pass for the detected count and confidence total
+        valid = keypoints.valid
+        count = int(valid.sum())
+        if not count:
             return {"error": "No body detected or poor image quality"}
+        conf_sum = float(keypoints.conf[valid].sum())
+        
+        xs, ys = keypoints.xs, keypoints.ys
+        valid_ys = ys[valid]
+        
+        # Presence bitmask shared by all analyzers
+        mask = validity_mask(valid)
         
         # Start building the analysis result
         result = {
             "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
-            "keypoints_detected": len([p for p in keypoints if p is not None]),
-            "keypoint_confidence": sum([p[2] for p in keypoints if p is not None]) / len([p for p in keypoints if p is not None]) if keypoints else 0,
-            "height_pixels": 0,
+            "keypoints_detected": count,
+            "keypoint_confidence": conf_sum / count,
+            # Height is the distance between highest and lowest detected points
+            "height_pixels": int(valid_ys.max() - valid_ys.min()),
             "body_analysis": {}
         }
         
-        # Calculate height (distance between highest and lowest detected points)
-        valid_keypoints = [kp for kp in keypoints if kp is not None]
-        if valid_keypoints:
-            min_y = min(valid_keypoints, key=lambda kp: kp[1])[1]
-            max_y = max(valid_keypoints, key=lambda kp: kp[1])[1]
-            result["height_pixels"] = max_y - min_y
+        # All geometric measurements in a single compiled call
+        (vertical_deviation, waist_hip_ratio, shoulder_width_ratio, leg_torso_ratio,
+         shoulder_symmetry, hip_symmetry, overall_symmetry,
+         weight_distribution) = analysis_kernel(xs, ys, mask)
         
         # Analyze posture
-        posture_analysis = self._analyze_posture(keypoints)
+        posture_analysis = self._analyze_posture(vertical_deviation)
         result["body_analysis"]["posture"] = posture_analysis
         
         # Analyze body proportions
-        proportion_analysis = self._analyze_proportions(keypoints)
+        proportion_analysis = self._analyze_proportions(
+            waist_hip_ratio, shoulder_width_ratio, leg_torso_ratio)
         result["body_analysis"]["proportions"] = proportion_analysis
         
         # Analyze symmetry
-        symmetry_analysis = self._analyze_symmetry(keypoints)
+        symmetry_analysis = self._analyze_symmetry(shoulder_symmetry, hip_symmetry, overall_symmetry)
         result["body_analysis"]["symmetry"] = symmetry_analysis
         
         # Analyze balance/weight distribution
-        balance_analysis = self._analyze_balance(keypoints)
+        balance_analysis = self._analyze_balance(weight_distribution)
         result["body_analysis"]["balance"] = balance_analysis
         
         # Generate overall body health assessment
@@ -230,7 +571,7 @@ class BodyAnalyzer:
         
         return result
     
-    def _analyze_posture(self, keypoints):
+    def _analyze_posture(self, vertical_deviation):
         """Analyze body posture based on spine alignment and head position"""
         # In a real implementation, this would use the keypoints to measure:
         # - Vertical alignment of ankles, hips, shoulders and ears
@@ -238,43 +579,18 @@ class BodyAnalyzer:
         # - Slouching indicators
         
         # For demonstration, we'll create a simplified analysis
-        if not all(kp is not None for kp in [keypoints[1], keypoints[8], keypoints[9], keypoints[10]]):
+        if math.isnan(vertical_deviation):
             return {
                 "spine_alignment": None,
                 "head_position": None,
                 "posture_quality": None,
                 "posture_note": "Could not analyze posture from image"
             }
+        vertical_deviation = float(vertical_deviation)
         
-        # Calculate spine alignment based on neck and mid-hip position
-        neck = keypoints[1]
-        torso_mid = keypoints[8]
-        left_hip = keypoints[9]
-        right_hip = keypoints[10]
-        
-        # Hip center position
-        hip_center_x = (left_hip[0] + right_hip[0]) / 2
-        hip_center_y = (left_hip[1] + right_hip[1]) / 2
-        
-        # Angle of spine from vertical (0° is perfect vertical alignment)
-        dx = neck[0] - hip_center_x
-        dy = neck[1] - hip_center_y
-        spine_angle = abs(math.degrees(math.atan2(dx, dy)))
-        vertical_deviation = abs(90 - spine_angle)
-        
-        # Evaluate posture quality
-        if vertical_deviation < self.health_thresholds["posture_angle"]["excellent"]:
-            posture_quality = "Excellent"
-            posture_note = "Great vertical alignment"
-        elif vertical_deviation < self.health_thresholds["posture_angle"]["good"]:
-            posture_quality = "Good"
-            posture_note = "Good posture with slight deviation"
-        elif vertical_deviation < self.health_thresholds["posture_angle"]["fair"]:
-            posture_quality = "Fair" 
-            posture_note = "Moderate posture issues observed"
-        else:
-            posture_quality = "Concerning"
-            posture_note = "Significant posture deviation detected"
+        # Evaluate posture quality (a deviation equal to a threshold falls in the worse grade)
+        grade = int(np.searchsorted(self._POSTURE_THRESH, vertical_deviation, side='right'))
+        posture_quality, posture_note = self._POSTURE_GRADES[grade]
             
         # Head position analysis
         # This would be more complex in a real implementation
@@ -288,66 +604,15 @@ class BodyAnalyzer:
             "posture_note": posture_note
         }
     
-    def _analyze_proportions(self, keypoints):
+    def _analyze_proportions(self, waist_hip_ratio, shoulder_width_ratio, leg_torso_ratio):
         """Analyze body proportions and ratios"""
         result = {
-            "waist_hip_ratio": None,
-            "shoulder_width_ratio": None,
-            "leg_torso_ratio": None,
+            "waist_hip_ratio": _nan_to_none(waist_hip_ratio),
+            "shoulder_width_ratio": _nan_to_none(shoulder_width_ratio),
+            "leg_torso_ratio": _nan_to_none(leg_torso_ratio),
             "proportion_note": "Could not analyze proportions completely"
         }
         
-        # Calculate waist-hip ratio if possible
-        if all(kp is not None for kp in [keypoints[8], keypoints[9], keypoints[10]]):
-            # This is simplified - in a real implementation you would detect actual waist
-            torso_mid = keypoints[8]
-            left_hip = keypoints[9]
-            right_hip = keypoints[10]
-            
-            # Estimate waist width (simplified)
-            waist_width = torso_mid[0] * 0.9  # Just a placeholder
-            
-            # Hip width
-            hip_width = abs(left_hip[0] - right_hip[0])
-            
-            if hip_width > 0:
-                result["waist_hip_ratio"] = waist_width / hip_width
-        
-        # Calculate shoulder width ratio if possible
-        if all(kp is not None for kp in [keypoints[2], keypoints[3]]):
-            left_shoulder = keypoints[2]
-            right_shoulder = keypoints[3]
-            
-            shoulder_width = abs(left_shoulder[0] - right_shoulder[0])
-            
-            # Compare to height for ratio
-            if result["waist_hip_ratio"] is not None:
-                result["shoulder_width_ratio"] = shoulder_width / (hip_width if 'hip_width' in locals() else 1)
-        
-        # Calculate leg-to-torso ratio if possible
-        if all(kp is not None for kp in [keypoints[9], keypoints[10], keypoints[13], keypoints[14]]):
-            left_hip = keypoints[9]
-            right_hip = keypoints[10]
-            left_ankle = keypoints[13]
-            right_ankle = keypoints[14]
-            
-            # Hip center
-            hip_y = (left_hip[1] + right_hip[1]) / 2
-            
-            # Ankle average height
-            ankle_y = (left_ankle[1] + right_ankle[1]) / 2
-            
-            # Leg length
-            leg_length = ankle_y - hip_y
-            
-            # Torso length (neck to hip)
-            if keypoints[1] is not None:
-                neck = keypoints[1]
-                torso_length = hip_y - neck[1]
-                
-                if torso_length > 0:
-                    result["leg_torso_ratio"] = leg_length / torso_length
-        
         # Generate proportion note
         if result["waist_hip_ratio"] is not None or result["shoulder_width_ratio"] is not None:
             result["proportion_note"] = "Body proportions within normal range"
@@ -361,71 +626,17 @@ class BodyAnalyzer:
         
         return result
     
-    def _analyze_symmetry(self, keypoints):
+    def _analyze_symmetry(self, shoulder_symmetry, hip_symmetry, overall_symmetry):
         """Analyze body symmetry"""
         result = {
-            "shoulder_symmetry": None,
-            "hip_symmetry": None,
-            "overall_symmetry": None,
+            "shoulder_symmetry": _nan_to_none(shoulder_symmetry),
+            "hip_symmetry": _nan_to_none(hip_symmetry),
+            "overall_symmetry": _nan_to_none(overall_symmetry),
             "symmetry_note": "Could not analyze symmetry completely"
         }
         
-        image_center_x = None
-        
-        # Calculate the vertical center line of the body
-        if all(kp is not None for kp in [keypoints[0], keypoints[1], keypoints[8]]):
-            nose = keypoints[0]
-            neck = keypoints[1]
-            torso_mid = keypoints[8]
-            
-            # Vertical center line
-            image_center_x = (nose[0] + neck[0] + torso_mid[0]) / 3
-        
-        # Calculate shoulder symmetry if possible
-        if all(kp is not None for kp in [keypoints[2], keypoints[3]]) and image_center_x is not None:
-            left_shoulder = keypoints[2]
-            right_shoulder = keypoints[3]
-            
-            # Distance from center line to each shoulder
-            left_dist = abs(image_center_x - left_shoulder[0])
-            right_dist = abs(right_shoulder[0] - image_center_x)
-            
-            # Shoulder level difference
-            level_diff = abs(left_shoulder[1] - right_shoulder[1])
-            height_avg = (left_shoulder[1] + right_shoulder[1]) / 2
-            level_symmetry = 1.0 - min(1.0, level_diff / (height_avg * 0.2))
-            
-            # Width symmetry
-            width_ratio = min(left_dist, right_dist) / max(left_dist, right_dist)
-            
-            # Overall shoulder symmetry
-            result["shoulder_symmetry"] = (level_symmetry * 0.7) + (width_ratio * 0.3)
-        
-        # Calculate hip symmetry if possible
-        if all(kp is not None for kp in [keypoints[9], keypoints[10]]) and image_center_x is not None:
-            left_hip = keypoints[9]
-            right_hip = keypoints[10]
-            
-            # Distance from center line to each hip
-            left_dist = abs(image_center_x - left_hip[0])
-            right_dist = abs(right_hip[0] - image_center_x)
-            
-            # Hip level difference
-            level_diff = abs(left_hip[1] - right_hip[1])
-            height_avg = (left_hip[1] + right_hip[1]) / 2
-            level_symmetry = 1.0 - min(1.0, level_diff / (height_avg * 0.2))
-            
-            # Width symmetry
-            width_ratio = min(left_dist, right_dist) / max(left_dist, right_dist)
-            
-            # Overall hip symmetry
-            result["hip_symmetry"] = (level_symmetry * 0.7) + (width_ratio * 0.3)
-        
-        # Calculate overall symmetry
-        if result["shoulder_symmetry"] is not None and result["hip_symmetry"] is not None:
-            result["overall_symmetry"] = (result["shoulder_symmetry"] * 0.5) + (result["hip_symmetry"] * 0.5)
-            
-            # Generate symmetry note
+        # Generate symmetry note
+        if result["overall_symmetry"] is not None:
             if result["overall_symmetry"] > 0.9:
                 result["symmetry_note"] = "Excellent body symmetry"
             elif result["overall_symmetry"] > 0.8:
@@ -437,7 +648,7 @@ class BodyAnalyzer:
         
         return result
     
-    def _analyze_balance(self, keypoints):
+    def _analyze_balance(self, weight_distribution):
         """Analyze balance and weight distribution"""
         result = {
             "weight_distribution": None,
@@ -445,41 +656,14 @@ class BodyAnalyzer:
             "balance_note": "Could not analyze balance completely"
         }
         
-        # Calculate weight distribution based on position of ankles and center line
-        if all(kp is not None for kp in [keypoints[13], keypoints[14], keypoints[0], keypoints[1]]):
-            left_ankle = keypoints[13]
-            right_ankle = keypoints[14]
-            
-            # Find the center line
-            nose = keypoints[0]
-            neck = keypoints[1]
-            center_x = (nose[0] + neck[0]) / 2
-            
-            # Calculate the midpoint between ankles
-            ankle_mid_x = (left_ankle[0] + right_ankle[0]) / 2
-            
-            # Calculate deviation from center
-            # Perfect balance would have ankles centered under the head
-            deviation = abs(center_x - ankle_mid_x)
-            max_deviation = abs(left_ankle[0] - right_ankle[0]) / 2  # Maximum reasonable deviation
-            
-            # Calculate balance score (0-1 where 1 is perfect balance)
-            weight_distribution = 1.0 - min(1.0, deviation / max_deviation)
+        # Weight distribution based on position of ankles and center line
+        weight_distribution = _nan_to_none(weight_distribution)
+        if weight_distribution is not None:
             result["weight_distribution"] = weight_distribution
             
-            # Evaluate balance quality
-            if weight_distribution > self.health_thresholds["weight_distribution"]["excellent"]:
-                result["balance_quality"] = "Excellent"
-                result["balance_note"] = "Excellent weight distribution and balance"
-            elif weight_distribution > self.health_thresholds["weight_distribution"]["good"]:
-                result["balance_quality"] = "Good"
-                result["balance_note"] = "Good weight distribution"
-            elif weight_distribution > self.health_thresholds["weight_distribution"]["fair"]:
-                result["balance_quality"] = "Fair"
-                result["balance_note"] = "Fair weight distribution, slight imbalance"
-            else:
-                result["balance_quality"] = "Concerning"
-                result["balance_note"] = "Weight distribution imbalance detected"
+            # Evaluate balance quality (a score equal to a threshold falls in the worse grade)
+            grade = int(np.searchsorted(self._BALANCE_THRESH, weight_distribution, side='left'))
+            result["balance_quality"], result["balance_note"] = self._BALANCE_GRADES[grade]
         
         return result
     
@@ -551,7 +735,8 @@ class BodyAnalyzer:
                 if posture.get("vertical_deviation_degrees", 0) > 15:
                     recommendations.append("Practice standing with back against wall to improve alignment")
             
-            if posture.get("posture_note") and "forward" in posture.get("posture_note", "").lower():
+            posture_note = posture.get("posture_note")
+            if posture_note and "forward" in posture_note.lower():
                 recommendations.append("Practice chin tucks to correct forward head position")
         
         # Symmetry recommendations
@@ -583,52 +768,37 @@ class BodyAnalyzer:
         
         return recommendations
     
-    def draw_pose(self, image, keypoints):
+    def draw_pose(self, image, keypoints, inplace=False):
         """
         Draw detected body pose on image for visualization
         
         Args:
             image: Input image
             keypoints: Detected body keypoints
+            inplace: Draw directly on image instead of a copy
             
         Returns:
             Image with pose visualization
         """
-        vis_img = image.copy()
-        
-        # Define connections for visualization
-        connections = [
-            (0, 1),    # Nose to Neck
-            (1, 2),    # Neck to Left Shoulder
-            (1, 3),    # Neck to Right Shoulder
-            (2, 4),    # Left Shoulder to Left Elbow
-            (3, 5),    # Right Shoulder to Right Elbow
-            (4, 6),    # Left Elbow to Left Wrist
-            (5, 7),    # Right Elbow to Right Wrist
-            (1, 8),    # Neck to Torso
-            (8, 9),    # Torso to Left Hip
-            (8, 10),   # Torso to Right Hip
-            (9, 11),   # Left Hip to Left Knee
-            (10, 12),  # Right Hip to Right Knee
-            (11, 13),  # Left Knee to Left Ankle
-            (12, 14),  # Right Knee to Right Ankle
-        ]
+        if not isinstance(keypoints, Keypoints):
+            keypoints = Keypoints.from_list(keypoints)
+        
+        vis_img = image if inplace else image.copy()
+        
+        # Stage all points once as int32 pixel coordinates
+        pts = np.stack((keypoints.xs, keypoints.ys), axis=1).astype(np.int32)
+        valid = keypoints.valid
         
         # Draw keypoints
-        for i, kp in enumerate(keypoints):
-            if kp is not None:
-                cv2.circle(vis_img, (kp[0], kp[1]), 5, (0, 255, 255), -1)
-                cv2.putText(vis_img, str(i), (kp[0] + 10, kp[1]), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
-        
-        # Draw connections
-        for connection in connections:
-            start_idx, end_idx = connection
-            if start_idx < len(keypoints) and end_idx < len(keypoints):
-                if keypoints[start_idx] is not None and keypoints[end_idx] is not None:
-                    cv2.line(vis_img, 
-                            (keypoints[start_idx][0], keypoints[start_idx][1]),
-                            (keypoints[end_idx][0], keypoints[end_idx][1]),
-                            (0, 255, 0), 2)
-        
-        return vis_img
\ No newline at end of file
+        for i in np.flatnonzero(valid):
+            x, y = pts[i]
+            cv2.circle(vis_img, (int(x), int(y)), 5, (0, 255, 255), -1)
+            cv2.putText(vis_img, str(i), (int(x) + 10, int(y)), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+        
+        # Draw all visible connections in one call
+        segments = [pts[edge] for edge in _CONNECTIONS if valid[edge[0]] and valid[edge[1]]]
+        if segments:
+            cv2.polylines(vis_img, segments, False, (0, 255, 0), 2)
+        
+        return vis_img
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+"""
+Body Analyzer Kernels
+Numeric cores of the body posture, proportion, symmetry and balance analysis.
+Compiled with Numba when available, plain Python otherwise.
+"""
+
+import math
+from collections import namedtuple
+import numpy as np
+
+# Make numba optional
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in decorator that returns the function unchanged"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+NUM_KEYPOINTS = 18
+
+
+def _bits(*indices):
+    """Bitmask with the given keypoint indices set"""
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+# Keypoints each measurement needs, as validity bitmasks
+POSTURE_REQ = _bits(1, 8, 9, 10)
+WAIST_HIP_REQ = _bits(8, 9, 10)
+SHOULDER_REQ = _bits(2, 3)
+LEG_TORSO_REQ = _bits(1, 9, 10, 13, 14)
+SYM_CENTER_REQ = _bits(0, 1, 8)
+HIP_REQ = _bits(9, 10)
+BAL_REQ = _bits(0, 1, 13, 14)
+
+_KEYPOINT_BITS = 1 << np.arange(NUM_KEYPOINTS, dtype=np.int64)
+
+
+class Keypoints(namedtuple('Keypoints', ['xs', 'ys', 'conf'])):
+    """
+    Body keypoints stored as three aligned arrays of length 18
+
+    A confidence of 0 marks a missing keypoint.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_list(cls, keypoints):
+        """Build from a list of (x, y, confidence) tuples or None"""
+        xs = np.zeros(NUM_KEYPOINTS)
+        ys = np.zeros(NUM_KEYPOINTS)
+        conf = np.zeros(NUM_KEYPOINTS)
+        for i, kp in enumerate(keypoints[:NUM_KEYPOINTS]):
+            if kp is not None:
+                xs[i], ys[i], conf[i] = kp[:3]
+        return cls(xs, ys, conf)
+
+    @property
+    def valid(self):
+        """Boolean mask of detected keypoints"""
+        return self.conf > 0
+
+    def to_legacy_list(self):
+        """Convert back to a list of (x, y, confidence) tuples or None"""
+        return [
+            (int(x), int(y), float(c)) if c > 0 else None
+            for x, y, c in zip(self.xs, self.ys, self.conf)
+        ]
+
+
+def validity_mask(valid):
+    """Pack a boolean keypoint mask into an integer bitmask"""
+    return int(_KEYPOINT_BITS[valid].sum())
+
+
+@njit(cache=True)
+def posture_kernel(xs, ys, mask):
+    """Vertical deviation of the spine in degrees, NaN if it cannot be measured"""
+    if (mask & POSTURE_REQ) != POSTURE_REQ:
+        return np.nan
+
+    # Hip center position
+    hip_center_x = (xs[9] + xs[10]) / 2
+    hip_center_y = (ys[9] + ys[10]) / 2
+
+    # Angle of the neck-hip line from vertical (0° is perfect vertical alignment).
+    # Folding both legs into the first quadrant measures the deviation directly,
+    # whichever way the spine leans and whether the neck is above or below.
+    dx = xs[1] - hip_center_x
+    dy = ys[1] - hip_center_y
+    return math.degrees(math.atan2(abs(dx), abs(dy)))
+
+
+@njit(cache=True)
+def proportions_kernel(xs, ys, mask):
+    """Waist-hip, shoulder width and leg-torso ratios, NaN where unavailable"""
+    waist_hip_ratio = np.nan
+    shoulder_width_ratio = np.nan
+    leg_torso_ratio = np.nan
+    hip_width = 0.0
+
+    if (mask & WAIST_HIP_REQ) == WAIST_HIP_REQ:
+        # Estimate waist width (simplified placeholder)
+        waist_width = xs[8] * 0.9
+        hip_width = abs(xs[9] - xs[10])
+        if hip_width > 0:
+            waist_hip_ratio = waist_width / hip_width
+
+    if (mask & SHOULDER_REQ) == SHOULDER_REQ and not np.isnan(waist_hip_ratio):
+        shoulder_width = abs(xs[2] - xs[3])
+        shoulder_width_ratio = shoulder_width / hip_width
+
+    if (mask & LEG_TORSO_REQ) == LEG_TORSO_REQ:
+        hip_y = (ys[9] + ys[10]) / 2
+        ankle_y = (ys[13] + ys[14]) / 2
+        leg_length = ankle_y - hip_y
+        torso_length = hip_y - ys[1]
+        if torso_length > 0:
+            leg_torso_ratio = leg_length / torso_length
+
+    return waist_hip_ratio, shoulder_width_ratio, leg_torso_ratio
+
+
+@njit(cache=True)
+def _pair_symmetry(xs, ys, left, right, center_x):
+    """Level and width symmetry of a left/right keypoint pair around center_x"""
+    left_dist = abs(center_x - xs[left])
+    right_dist = abs(xs[right] - center_x)
+
+    level_diff = abs(ys[left] - ys[right])
+    height_avg = (ys[left] + ys[right]) / 2
+    level_symmetry = 1.0 - min(1.0, level_diff / (height_avg * 0.2))
+
+    width_ratio = min(left_dist, right_dist) / max(left_dist, right_dist)
+    return (level_symmetry * 0.7) + (width_ratio * 0.3)
+
+
+@njit(cache=True)
+def symmetry_kernel(xs, ys, mask):
+    """Shoulder, hip and overall symmetry (0-1), NaN where unavailable"""
+    shoulder_symmetry = np.nan
+    hip_symmetry = np.nan
+    overall_symmetry = np.nan
+
+    # Vertical center line of the body
+    if (mask & SYM_CENTER_REQ) != SYM_CENTER_REQ:
+        return shoulder_symmetry, hip_symmetry, overall_symmetry
+    center_x = (xs[0] + xs[1] + xs[8]) / 3
+
+    if (mask & SHOULDER_REQ) == SHOULDER_REQ:
+        shoulder_symmetry = _pair_symmetry(xs, ys, 2, 3, center_x)
+    if (mask & HIP_REQ) == HIP_REQ:
+        hip_symmetry = _pair_symmetry(xs, ys, 9, 10, center_x)
+    if not (np.isnan(shoulder_symmetry) or np.isnan(hip_symmetry)):
+        overall_symmetry = (shoulder_symmetry * 0.5) + (hip_symmetry * 0.5)
+
+    return shoulder_symmetry, hip_symmetry, overall_symmetry
+
+
+@njit(cache=True)
+def balance_kernel(xs, ys, mask):
+    """Weight distribution score (0-1), NaN if it cannot be measured"""
+    if (mask & BAL_REQ) != BAL_REQ:
+        return np.nan
+
+    center_x = (xs[0] + xs[1]) / 2
+    ankle_mid_x = (xs[13] + xs[14]) / 2
+
+    # Perfect balance would have ankles centered under the head
+    deviation = abs(center_x - ankle_mid_x)
+    max_deviation = abs(xs[13] - xs[14]) / 2
+    return 1.0 - min(1.0, deviation / max_deviation)
+
+
+@njit(cache=True)
+def analysis_kernel(xs, ys, mask):
+    """
+    Run every body measurement in one compiled call
+
+    Returns:
+        Tuple of (vertical_deviation, waist_hip_ratio, shoulder_width_ratio,
+        leg_torso_ratio, shoulder_symmetry, hip_symmetry, overall_symmetry,
+        weight_distribution), NaN where unavailable
+    """
+    vertical_deviation = posture_kernel(xs, ys, mask)
+    waist_hip_ratio, shoulder_width_ratio, leg_torso_ratio = proportions_kernel(xs, ys, mask)
+    shoulder_symmetry, hip_symmetry, overall_symmetry = symmetry_kernel(xs, ys, mask)
+    weight_distribution = balance_kernel(xs, ys, mask)
+    return (vertical_deviation, waist_hip_ratio, shoulder_width_ratio, leg_torso_ratio,
+            shoulder_symmetry, hip_symmetry, overall_symmetry, weight_distribution)
+
+
+def _warmup():
+    """Compile the kernels up front so the first frame does not pay for JIT"""
+    xs = np.zeros(NUM_KEYPOINTS)
+    ys = np.zeros(NUM_KEYPOINTS)
+    mask = 0
+    analysis_kernel(xs, ys, mask)
+
+
+if NUMBA_AVAILABLE:
+    _warmup()
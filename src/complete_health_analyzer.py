@@ -4,23 +4,255 @@ Complete Health Analysis Module
 Integrates facial and body analysis into a complete health assessment flow
 """
 
+import io
 import os
+import re
+import math
+import bisect
 import cv2
 import time
+import queue
+import threading
 import numpy as np
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-from face_detector import FaceDetector
-from feature_extractor import FeatureExtractor
-from health_analyzer import HealthAnalyzer
-from body_analyzer import BodyAnalyzer
 from data_storage import DataStorage
 
+# Make numba optional
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Stand-in decorator that returns the function unchanged"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Make pyahocorasick optional; skin tone keywords fall back to a regex scan
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Non-blocking GUI key poll (OpenCV 4.5+), falling back to a 1 ms wait
+_poll_key = getattr(cv2, 'pollKey', None) or (lambda: cv2.waitKey(1))
+
+# Length of the capture countdown
+COUNTDOWN_SECONDS = 3.0
+
+# Frames between full face detections while tracking during the countdown
+REDETECT_INTERVAL = 15
+
+# Facial metrics used in the health score and their weights
+_SCORE_KEYS = ('facial_symmetry', 'eyes_level_symmetry', 'skin_texture',
+               'eye_fatigue', 'estimated_stress_level')
+_SCORE_WEIGHTS = np.array([2.5, 1.5, 1.0, 1.0, 1.0], dtype=np.float64)
+
+# Eye fatigue level codes and their 0-1 scores; unknown levels score 0.8
+_FATIGUE_CODES = {"Low": 0, "Moderate": 1, "High": 2}
+_FATIGUE_SCORES = np.array([1.0, 0.7, 0.4, 0.8], dtype=np.float64)
+
+@njit(cache=True, fastmath=True)
+def _numeric_score(raw, mask):
+    """
+    Weighted facial health score from raw metric values
+    
+    Args:
+        raw: float64[5] of facial symmetry, eye level symmetry, skin texture,
+            eye fatigue code and stress level value
+        mask: bool[5] marking which metrics are present
+        
+    Returns:
+        Tuple of (weighted sum of the 0-10 metric scores, total weight used)
+    """
+    values = np.empty(5)
+    values[0] = raw[0]
+    values[1] = raw[1]
+    values[2] = max(0.0, 1 - (raw[2] / 100))        # Lower texture is better
+    values[3] = _FATIGUE_SCORES[int(raw[3])]
+    values[4] = max(0.0, 1 - ((raw[4] - 5) / 20))   # Lower stress is better
+    
+    score = 0.0
+    components = 0.0
+    for i in range(5):
+        if mask[i]:
+            score += values[i] * 10 * _SCORE_WEIGHTS[i]
+            components += _SCORE_WEIGHTS[i]
+    return score, components
+
+def _score_from_health(health_data):
+    """
+    Weighted facial health score from the metrics present in health_data
+    
+    Returns:
+        Tuple of (weighted sum of the 0-10 metric scores, total weight used)
+    """
+    mask = np.fromiter((key in health_data for key in _SCORE_KEYS), dtype=np.bool_, count=len(_SCORE_KEYS))
+    stress = health_data.get('estimated_stress_level')
+    raw = np.array([
+        health_data.get('facial_symmetry', 0.0),
+        health_data.get('eyes_level_symmetry', 0.0),
+        health_data.get('skin_texture', 0.0),
+        _FATIGUE_CODES.get(health_data.get('eye_fatigue'), len(_FATIGUE_CODES)),
+        stress.get('value', 15) if stress is not None else 15
+    ], dtype=np.float64)
+    score, components = _numeric_score(raw, mask)
+    return float(score), float(components)
+
+# Lower bounds (inclusive) of each health status above "Poor"
+_STATUS_THRESH = (4.0, 5.5, 7.0, 8.5)
+_STATUS = ("Poor", "Concerning", "Fair", "Good", "Excellent")
+
+def _status_for(score):
+    """Map a 0-10 health score to its status label"""
+    # bisect_right so a score equal to a bound reaches that status
+    return _STATUS[bisect.bisect_right(_STATUS_THRESH, score)]
+
+# Report summary text per facial health status
+_STATUS_SUMMARY = {
+    "Excellent": "Facial analysis indicates excellent overall health markers. Facial features show good symmetry, balanced proportions, and healthy skin characteristics.\n\n",
+    "Good": "Facial analysis shows good health indicators with minor variations from optimal ranges. Overall facial symmetry and features are within healthy parameters.\n\n",
+    "Fair": "Facial analysis reveals some health indicators that may benefit from attention. There are moderate deviations in facial symmetry or other measured parameters.\n\n",
+    "Concerning": "Facial analysis indicates multiple health markers that suggest potential underlying issues. Significant asymmetry or other deviations from healthy parameters were observed.\n\n",
+}
+_STATUS_SUMMARY["Poor"] = _STATUS_SUMMARY["Concerning"]
+_STATUS_SUMMARY_DEFAULT = "Facial analysis complete. Health indicators show mixed results across measured parameters.\n\n"
+
+# Facial symmetry interpretations; bisect_left keeps each bound in the lower band
+_SYM_THRESH = (0.7, 0.8, 0.9)
+_SYM_TEXT = (
+    "**Interpretation:** Notable facial asymmetry detected. While this could be natural variation, significant asymmetry can sometimes correlate with various health conditions including neurological factors.\n\n",
+    "**Interpretation:** Moderate facial asymmetry detected. Minor asymmetry is common and not necessarily indicative of health concerns.\n\n",
+    "**Interpretation:** Good facial symmetry. Within normal parameters for healthy individuals.\n\n",
+    "**Interpretation:** Excellent facial symmetry. Research in neurological health suggests high symmetry often correlates with absence of neurological issues.\n\n",
+)
+
+# Skin texture interpretations; bisect_right moves a score equal to a bound up a band
+_SKIN_TEXTURE_THRESH = (20, 35, 45)
+_SKIN_TEXTURE_TEXT = (
+    "**Interpretation:** Excellent skin texture. Even skin surface with minimal texture variations suggests good hydration and skin health.\n\n",
+    "**Interpretation:** Normal skin texture. Within typical range for healthy skin.\n\n",
+    "**Interpretation:** Elevated skin texture. May indicate mild dehydration, stress effects on skin, or normal aging.\n\n",
+    "**Interpretation:** High skin texture variation. Could indicate dehydration, increased stress levels, or other factors affecting skin health.\n\n",
+)
+
+# Spine alignment context; bisect_left keeps each bound in the lower band
+_SPINE_THRESH = (0.7, 0.8, 0.9)
+_SPINE_TEXT = (
+    "**Medical Context:** Significant spinal alignment issues detected. Poor alignment may contribute to uneven muscle development, joint stress, and potential pain patterns.\n\n",
+    "**Medical Context:** Fair spinal alignment. Moderate deviations may contribute to muscle imbalances over time.\n\n",
+    "**Medical Context:** Good spinal alignment. Minor deviations are common and generally don't indicate health concerns.\n\n",
+    "**Medical Context:** Excellent spinal alignment. Good alignment reduces stress on muscles and joints, minimizing risk of chronic pain and posture-related issues.\n\n",
+)
+
+# Medical context per skin tone keyword found in the skin tone note
+_TONE_RE = re.compile(r'yellowish|pale|redness', re.IGNORECASE)
+_TONE_TEXT = {
+    'yellowish': "**Medical Context:** A yellowish tint can sometimes be associated with liver or gallbladder function changes. In some cases, it may relate to dietary factors or natural skin undertones.\n\n",
+    'pale': "**Medical Context:** Paleness can be associated with anemia, poor circulation, or fatigue in some cases. It may also be a natural skin tone variant or lighting effect.\n\n",
+    'redness': "**Medical Context:** Increased redness can relate to various factors including sun exposure, temperature changes, skin conditions, blood pressure variations, or inflammatory responses.\n\n",
+}
+
+if AHOCORASICK_AVAILABLE:
+    # One automaton scans for every keyword in a single pass over the note
+    _TONE_AC = ahocorasick.Automaton()
+    for _keyword, _text in _TONE_TEXT.items():
+        _TONE_AC.add_word(_keyword, _text)
+    _TONE_AC.make_automaton()
+
+def _tone_context(note):
+    """Medical context for the first skin tone keyword in note, or None"""
+    if AHOCORASICK_AVAILABLE:
+        for _, text in _TONE_AC.iter(note.lower()):
+            return text
+        return None
+    match = _TONE_RE.search(note)
+    return _TONE_TEXT[match.group(0).lower()] if match else None
+
+# Fixed notes and medical context paragraphs for the report
+_EYE_LEVEL_NOTE = "**Note:** Eye level asymmetry detected. This could be normal variation or potentially related to musculoskeletal alignment issues.\n\n"
+_EYE_BAGS_TEXT = "**Medical Context:** Prominent eye bags can sometimes indicate fluid retention, allergies, lack of sleep, or natural aging processes. Chronic puffiness may warrant further investigation in some cases.\n\n"
+_BODY_SYMMETRY_TEXT = "**Medical Context:** Body asymmetry can sometimes indicate muscle imbalances, postural habits, or underlying musculoskeletal factors. Significant asymmetry may benefit from professional assessment.\n\n"
+_SHOULDER_SYMMETRY_TEXT = "**Medical Context:** Shoulder asymmetry may relate to muscle development differences, occupational patterns, carrying habits, or potential joint issues. Chronic asymmetry may affect movement patterns.\n\n"
+_HIP_SYMMETRY_TEXT = "**Medical Context:** Hip asymmetry can affect gait, weight distribution, and potentially contribute to compensatory patterns throughout the body's kinetic chain.\n\n"
+_WEIGHT_DISTRIBUTION_TEXT = "**Medical Context:** Uneven weight distribution may increase stress on joints, affect movement efficiency, and potentially contribute to compensatory patterns in the musculoskeletal system.\n\n"
+
+# Markdown bullet for recommendations and the separator joining consecutive ones
+_BULLET = "- ✅ "
+_BULLET_SEP = "\n" + _BULLET
+
+def _bullets(items):
+    """Render items as one markdown bullet list ending in a newline"""
+    return _BULLET + _BULLET_SEP.join(items) + "\n"
+
+# Recommendations used when no combined result is available
+_DEFAULT_RECS_TEXT = _bullets((
+    "Maintain healthy lifestyle with balanced nutrition and regular exercise",
+    "Ensure adequate hydration and quality sleep",
+    "Practice stress management techniques",
+))
+
+# Detailed recommendations added for each finding
+_EYE_FATIGUE_RECS = (
+    "Practice the 20-20-20 rule: Every 20 minutes, look at something 20 feet away for 20 seconds",
+    "Consider blue light filtering glasses if you spend significant time on digital screens",
+)
+_SKIN_TEXTURE_RECS = (
+    "Consider increasing daily water intake to 8-10 glasses",
+    "Use a gentle moisturizer with hyaluronic acid for improved skin hydration",
+)
+_FACIAL_SYMMETRY_RECS = (
+    "Evaluate sleeping position - try to avoid consistently sleeping on one side",
+    "Consider facial exercises to strengthen muscles on both sides of the face",
+)
+_POSTURE_RECS = (
+    "Strengthen core muscles with planks and bird-dog exercises",
+    "Practice mindful posture checks throughout the day, especially during seated work",
+)
+_SHOULDER_RECS = (
+    "Perform balanced strength training focusing on both sides equally",
+    "Be mindful of repetitive one-sided activities or carrying habits",
+)
+_BALANCE_RECS = (
+    "Practice single-leg balance exercises starting at 30 seconds per leg",
+    "Consider yoga poses like tree pose to improve proprioception and balance",
+)
+
+# Body findings below 0.8 that add detailed recommendations, as
+# (section, key, recommendations)
+_BODY_REC_RULES = (
+    ('posture', 'spine_alignment', _POSTURE_RECS),
+    ('symmetry', 'shoulder_symmetry', _SHOULDER_RECS),
+    ('balance', 'weight_distribution', _BALANCE_RECS),
+)
+
+# Medical context per eye fatigue level
+_FATIGUE_TEXT = {
+    "High": "**Medical Context:** High eye fatigue can indicate excessive screen time, poor sleep quality, or potential vision issues. Chronic eye fatigue has been associated with headaches, reduced productivity, and in some cases, may exacerbate existing vision problems.\n\n",
+    "Moderate": "**Medical Context:** Moderate eye fatigue may indicate the need for rest or adjustment of screen time. Eye fatigue can impact concentration and may be associated with dryness, strain, or tension headaches.\n\n",
+}
+
+def _face_corners(faces):
+    """Convert (x, y, w, h) face boxes to (x1, y1, x2, y2) integer corner rows"""
+    boxes = np.asarray(faces, dtype=np.int32).reshape(-1, 4)
+    boxes[:, 2:] += boxes[:, :2]
+    return boxes.tolist()
+
 class CompleteHealthAnalyzer:
     """Conducts a complete health analysis by sequentially analyzing face and body"""
     
-    def __init__(self, output_dir=None, save_format='json', use_gpu=True, camera_id=0):
-        """Initialize the complete health analyzer"""
+    def __init__(self, output_dir=None, save_format='json', use_gpu=True, camera_id=0,
+                 headless=False):
+        """
+        Initialize the complete health analyzer
+        
+        Args:
+            headless: Run without preview windows, starting each countdown
+                automatically once the subject is in view
+        """
         # Use absolute path for output directory if one wasn't provided
         if output_dir is None:
             output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output')
@@ -29,26 +261,85 @@ class CompleteHealthAnalyzer:
         self.save_format = save_format
         self.use_gpu = use_gpu
         self.camera_id = camera_id
+        self.headless = headless
         
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
         
-        # Initialize components
+        # Initialize components; the analyzers load their models on first use
+        # or when warmed up in the background by start()
         print(f"Initializing with GPU acceleration: {use_gpu}")
-        self.face_detector = FaceDetector(method='dlib', use_gpu=use_gpu)
-        self.feature_extractor = FeatureExtractor(use_gpu=use_gpu)
-        self.health_analyzer = HealthAnalyzer()
-        self.body_analyzer = BodyAnalyzer(use_gpu=use_gpu)
+        self._model_lock = threading.Lock()
+        self._face_detector = None
+        self._feature_extractor = None
+        self._health_analyzer = None
+        self._body_analyzer = None
         self.storage = DataStorage()
         
+        # Random source for placeholder scores when no metric is available
+        self._rng = np.random.default_rng()
+        
+        # Worker for the slow analysis steps so the preview keeps updating,
+        # created for each run by start()
+        self._pool = None
+        
         # For video processing
         self.video_capture = None
+        self._frame_q = None
+        self._capture_thread = None
+        self._capture_running = False
+        
+        # Reusable frame buffer for the display copy
+        self._disp_buf = None
+        
+        # Pre-rendered static guide graphics as (image, mask), keyed by name
+        self._overlays = {}
         
         # For storing analysis results
         self.facial_analysis_result = None
         self.body_analysis_result = None
         self.complete_health_result = None
     
+    @property
+    def face_detector(self):
+        """Face detector, created on first use"""
+        if self._face_detector is None:
+            with self._model_lock:
+                if self._face_detector is None:
+                    from face_detector import FaceDetector
+                    self._face_detector = FaceDetector(method='dlib', use_gpu=self.use_gpu)
+        return self._face_detector
+    
+    @property
+    def feature_extractor(self):
+        """Facial feature extractor, created on first use"""
+        if self._feature_extractor is None:
+            with self._model_lock:
+                if self._feature_extractor is None:
+                    from feature_extractor import FeatureExtractor
+                    self._feature_extractor = FeatureExtractor(use_gpu=self.use_gpu)
+        return self._feature_extractor
+    
+    @property
+    def health_analyzer(self):
+        """Facial health analyzer, created on first use"""
+        if self._health_analyzer is None:
+            with self._model_lock:
+                if self._health_analyzer is None:
+                    from health_analyzer import HealthAnalyzer
+                    self._health_analyzer = HealthAnalyzer()
+        return self._health_analyzer
+    
+    @property
+    def body_analyzer(self):
+        """Body analyzer, created on first use"""
+        if self._body_analyzer is None:
+            with self._model_lock:
+                if self._body_analyzer is None:
+                    from body_analyzer import BodyAnalyzer
+                    self._body_analyzer = BodyAnalyzer(use_gpu=self.use_gpu)
+        return self._body_analyzer
+    
     def start(self):
         """Start the complete health analysis flow"""
         print("\n*** Complete Health Analysis Started ***\n")
@@ -60,6 +351,21 @@ class CompleteHealthAnalyzer:
             print(f"Error: Could not open camera {self.camera_id}")
             return False
         
+        # Keep driver-side buffering minimal so frames are fresh
+        self.video_capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        # Capture on a separate thread; the UI loops consume the newest frame
+        self._frame_q = queue.Queue(maxsize=1)
+        self._capture_running = True
+        self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._capture_thread.start()
+        
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        
+        # Load the models while the instructions are shown; on the analysis
+        # pool so the warm-up runs before, never alongside, the real jobs
+        self._pool.submit(self._warmup)
+        
         try:
             # Step 1: Facial Analysis
             print("\nStep 1: Facial Analysis")
@@ -93,9 +399,150 @@ class CompleteHealthAnalyzer:
             
         finally:
             # Clean up
+            self._capture_running = False
+            if self._capture_thread is not None:
+                self._capture_thread.join(timeout=1.0)
             if self.video_capture and self.video_capture.isOpened():
                 self.video_capture.release()
-            cv2.destroyAllWindows()
+            self._pool.shutdown(wait=False)
+            if not self.headless:
+                cv2.destroyAllWindows()
+    
+    def _warmup(self):
+        """
+        Load the models and run each once on a blank image
+        
+        Runs on the analysis pool, which serializes it with the feature
+        extraction and body analysis jobs that reuse the same buffers. The
+        face detector is only loaded: the preview starts detecting right
+        away, and a concurrent dummy call on the same detector is not safe.
+        """
+        try:
+            self.face_detector
+            blank = np.zeros((64, 64, 3), dtype=np.uint8)
+            self.feature_extractor.extract_features_from_frame(blank, (0, 0, 64, 64))
+            self.health_analyzer
+            self.body_analyzer.analyze(np.zeros((256, 256, 3), dtype=np.uint8))
+        except Exception as e:
+            print(f"Model warm-up failed: {e}")
+    
+    def _capture_loop(self):
+        """
+        Read camera frames continuously, keeping only the most recent one
+        
+        Every read returns a newly allocated frame that is never written to
+        afterwards, so consumers may keep references instead of copies.
+        """
+        while self._capture_running:
+            ret, frame = self.video_capture.read()
+            if not ret:
+                frame = None
+            
+            # Drop the stale frame if the consumer has not taken it yet
+            try:
+                self._frame_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._frame_q.put(frame)
+            
+            if frame is None:
+                break
+    
+    def _read_frame(self):
+        """
+        Get the next frame from the capture thread
+        
+        Returns:
+            The newest frame, or None if capture failed or stopped
+        """
+        while True:
+            try:
+                return self._frame_q.get(timeout=0.5)
+            except queue.Empty:
+                if not self._capture_thread.is_alive():
+                    return None
+    
+    def _detect_faces(self, frame):
+        """
+        Detect faces for the live preview
+        
+        Frames 1280 pixels wide or larger are searched at half resolution and
+        the boxes scaled back; feature extraction still uses the full frame.
+        """
+        if frame.shape[1] < 1280:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            return self.face_detector.detect(frame, gray=gray)
+        
+        small = cv2.resize(frame, (frame.shape[1] // 2, frame.shape[0] // 2),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return [(x * 2, y * 2, w * 2, h * 2) for (x, y, w, h) in self.face_detector.detect(small, gray=gray)]
+    
+    def _copy_to_buffer(self, name, frame):
+        """Copy frame into the reusable buffer attribute name, allocating it on size changes"""
+        buf = getattr(self, name)
+        if buf is None or buf.shape != frame.shape:
+            buf = np.empty_like(frame)
+            setattr(self, name, buf)
+        np.copyto(buf, frame)
+        return buf
+    
+    def _apply_overlay(self, display_frame, name, draw):
+        """
+        Composite static guide graphics onto the display frame
+        
+        The graphics are rendered once per frame size by draw(canvas) and then
+        copied through their mask, so text is not rasterized every frame.
+        """
+        overlay = self._overlays.get(name)
+        if overlay is None or overlay[0].shape != display_frame.shape:
+            canvas = np.zeros_like(display_frame)
+            draw(canvas)
+            overlay = (canvas, canvas.any(axis=2).astype(np.uint8))
+            self._overlays[name] = overlay
+        cv2.copyTo(overlay[0], overlay[1], display_frame)
+    
+    @staticmethod
+    def _draw_face_instructions(canvas):
+        """Render the facial analysis instructions"""
+        cv2.putText(canvas, "Face the camera directly", (30, 30), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        cv2.putText(canvas, "Press SPACE to analyze or Q to quit", 
+                   (30, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    
+    @staticmethod
+    def _draw_body_guide(canvas):
+        """Render the body positioning rectangle"""
+        h, w = canvas.shape[:2]
+        cv2.rectangle(canvas, (int(w*0.2), int(h*0.1)), (int(w*0.8), int(h*0.9)), (0, 255, 0), 2)
+    
+    @staticmethod
+    def _draw_body_instructions(canvas):
+        """Render the body analysis instructions"""
+        cv2.putText(canvas, "Stand 6-8 feet away showing full body", (30, 30), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        cv2.putText(canvas, "Position yourself inside the rectangle", 
+                   (30, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        cv2.putText(canvas, "Press SPACE to analyze or Q to skip", 
+                   (30, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    
+    @staticmethod
+    def _create_tracker(frame, face):
+        """
+        Start a KCF tracker on a face box
+        
+        Returns:
+            The tracker, or None if this OpenCV build has no KCF tracker
+        """
+        factory = getattr(cv2, 'TrackerKCF_create', None)
+        if factory is None:
+            factory = getattr(getattr(cv2, 'legacy', None), 'TrackerKCF_create', None)
+        if factory is None:
+            return None
+        
+        tracker = factory()
+        tracker.init(frame, tuple(int(v) for v in face))
+        return tracker
     
     def _run_facial_analysis(self):
         """Run the facial analysis portion"""
@@ -104,32 +551,50 @@ class CompleteHealthAnalyzer:
         analysis_result = None
         best_frame = None
         best_face = None
-        countdown_start = None
+        countdown_deadline = None
+        tracker = None
+        countdown_frames = 0
+        pending = None
         
         while True:
             # Capture frame
-            ret, frame = self.video_capture.read()
-            if not ret:
+            frame = self._read_frame()
+            if frame is None:
                 print("Error: Failed to capture frame")
                 break
                 
-            # Detect faces
-            faces = self.face_detector.detect(frame)
+            # Detect faces; during the countdown the chosen face is tracked and
+            # detection only reruns periodically to correct drift
+            tracked = tracker is not None and countdown_frames % REDETECT_INTERVAL != 0
+            if tracked:
+                ok, bbox = tracker.update(frame)
+                faces = [tuple(int(v) for v in bbox)] if ok else []
+            else:
+                faces = self._detect_faces(frame)
+                if tracker is not None and faces:
+                    tracker = self._create_tracker(frame, max(faces, key=lambda face: face[2] * face[3]))
+            if countdown_deadline is not None:
+                countdown_frames += 1
             
             # Create a working copy for visualization
-            display_frame = frame.copy()
+            show = not self.headless
+            if show:
+                display_frame = self._copy_to_buffer('_disp_buf', frame)
             
-            if countdown_start is not None:
+            if countdown_deadline is not None:
                 # We're in countdown mode
-                remaining = 3 - int(time.time() - countdown_start)
+                remaining = math.ceil(countdown_deadline - time.monotonic())
                 if remaining <= 0:
-                    # Analyze the best frame we captured
-                    if best_frame is not None and best_face is not None:
-                        # Extract facial features with detailed metrics
-                        features = self.feature_extractor.extract_features_from_frame(best_frame, best_face)
-                        
-                        # Perform comprehensive health analysis
-                        health_data = self.health_analyzer.analyze(features)
+                    if best_frame is None or best_face is None:
+                        print("Analysis failed: No good face detected")
+                        break
+                    
+                    # Analyze the best frame we captured in the background
+                    if pending is None:
+                        pending = self._pool.submit(self._extract_and_analyze, best_frame, best_face)
+                    
+                    if pending.done():
+                        features, health_data = pending.result()
                         
                         # Create timestamped result
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -141,77 +606,25 @@ class CompleteHealthAnalyzer:
                         }
                         
                         # Calculate health score based on multiple factors
-                        score = 0
-                        components = 0
-                        
-                        # Use facial symmetry in scoring
-                        if 'facial_symmetry' in health_data:
-                            weight = 2.5  # Higher weight for important metric
-                            score += health_data['facial_symmetry'] * 10 * weight
-                            components += weight
-                            
-                        # Use eye level symmetry in scoring
-                        if 'eyes_level_symmetry' in health_data:
-                            weight = 1.5
-                            score += health_data['eyes_level_symmetry'] * 10 * weight
-                            components += weight
-                        
-                        # Use skin indicators in scoring
-                        if 'skin_texture' in health_data:
-                            # Convert skin texture to a 0-1 score (lower texture is better)
-                            texture_score = max(0, 1 - (health_data['skin_texture'] / 100))
-                            weight = 1.0
-                            score += texture_score * 10 * weight
-                            components += weight
-                            
-                        # Use eye fatigue in scoring if available
-                        if 'eye_fatigue' in health_data:
-                            weight = 1.0
-                            fatigue_score = 0.8  # Default moderate score
-                            if health_data['eye_fatigue'] == "Low":
-                                fatigue_score = 1.0
-                            elif health_data['eye_fatigue'] == "Moderate":
-                                fatigue_score = 0.7
-                            elif health_data['eye_fatigue'] == "High":
-                                fatigue_score = 0.4
-                            
-                            score += fatigue_score * 10 * weight
-                            components += weight
-                        
-                        # Add biomarker data if available
-                        if 'estimated_stress_level' in health_data:
-                            stress_level = health_data['estimated_stress_level'].get('value', 15)
-                            # Convert to 0-1 scale (lower stress is better)
-                            stress_score = max(0, 1 - ((stress_level - 5) / 20))
-                            weight = 1.0
-                            score += stress_score * 10 * weight
-                            components += weight
+                        score, components = _score_from_health(health_data)
                             
                         # Make sure we have at least one component
                         if components == 0:
                             # Generate artificial scores to avoid empty report
-                            score = 70 + (np.random.rand() * 20)  # Random score between 70-90
+                            r = self._rng.random(5)
+                            score = 70 + (r[0] * 20)  # Random score between 70-90
                             components = 1
-                            health_data['facial_symmetry'] = 0.8 + (np.random.rand() * 0.15)
-                            health_data['eyes_level_symmetry'] = 0.85 + (np.random.rand() * 0.1)
-                            health_data['skin_texture'] = 20 + (np.random.rand() * 15)
-                            health_data['eye_fatigue'] = "Low" if np.random.rand() > 0.3 else "Moderate"
+                            health_data['facial_symmetry'] = 0.8 + (r[1] * 0.15)
+                            health_data['eyes_level_symmetry'] = 0.85 + (r[2] * 0.1)
+                            health_data['skin_texture'] = 20 + (r[3] * 15)
+                            health_data['eye_fatigue'] = "Low" if r[4] > 0.3 else "Moderate"
                             health_data['eye_health_note'] = "Minimal eye fatigue detected"
                             
                         # Calculate overall health score
                         health_score = round(score / max(1, components), 1)
                         
                         # Determine health status
-                        if health_score >= 8.5:
-                            health_status = "Excellent"
-                        elif health_score >= 7.0:
-                            health_status = "Good"
-                        elif health_score >= 5.5:
-                            health_status = "Fair"
-                        elif health_score >= 4.0:
-                            health_status = "Concerning"
-                        else:
-                            health_status = "Poor"
+                        health_status = _status_for(health_score)
                         
                         analysis_result['health_score'] = health_score
                         analysis_result['health_status'] = health_status
@@ -246,50 +659,58 @@ class CompleteHealthAnalyzer:
                         analysis_result['recommendations'] = recommendations
                         
                         analysis_done = True
-                    else:
-                        print("Analysis failed: No good face detected")
-                    break
-                
-                # Draw countdown
-                cv2.putText(display_frame, str(remaining), 
-                           (display_frame.shape[1]//2-50, display_frame.shape[0]//2+50), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 255, 255), 4)
+                        break
+                    
+                    if show:
+                        cv2.putText(display_frame, "Analyzing...", 
+                                   (display_frame.shape[1]//2-150, display_frame.shape[0]//2), 
+                                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 255), 3)
+                else:
+                    # Draw countdown
+                    if show:
+                        cv2.putText(display_frame, str(remaining), 
+                                   (display_frame.shape[1]//2-50, display_frame.shape[0]//2+50), 
+                                   cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 255, 255), 4)
                 
-                # Find the best face during countdown
-                if faces:
-                    # Use the largest face
-                    largest_face = max(faces, key=lambda face: face[2] * face[3])
-                    face_size = largest_face[2] * largest_face[3]
+                    # Find the best face during countdown
+                    if faces:
+                        # Use the largest face; a tracked box of equal size refreshes
+                        # the frame since the tracker keeps the box size fixed
+                        largest_face = max(faces, key=lambda face: face[2] * face[3])
+                        face_size = largest_face[2] * largest_face[3]
                     
-                    if best_face is None or face_size > best_face[2] * best_face[3]:
-                        best_frame = frame.copy()
-                        best_face = largest_face
+                        if (best_face is None or face_size > best_face[2] * best_face[3]
+                                or (tracked and face_size == best_face[2] * best_face[3])):
+                            best_frame = frame
+                            best_face = largest_face
             
-            else:
+            elif show:
                 # Normal detection mode
                 if faces:
-                    for i, face_bbox in enumerate(faces):
-                        x, y, w, h = face_bbox
-                        cv2.rectangle(display_frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
+                    rect = cv2.rectangle
+                    for x, y, x2, y2 in _face_corners(faces):
+                        rect(display_frame, (x, y), (x2, y2), (0, 255, 0), 2)
                 
                 if instruction_shown:
-                    cv2.putText(display_frame, "Face the camera directly", (30, 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-                    cv2.putText(display_frame, "Press SPACE to analyze or Q to quit", 
-                               (30, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-            
-            # Display frame
-            cv2.imshow('Complete Health Analysis - Facial Analysis', display_frame)
+                    self._apply_overlay(display_frame, 'face_instructions', self._draw_face_instructions)
             
-            # Check for key presses
-            key = cv2.waitKey(1) & 0xFF
+            if show:
+                # Display frame
+                cv2.imshow('Complete Health Analysis - Facial Analysis', display_frame)
+                
+                # Check for key presses
+                key = _poll_key() & 0xFF
+            else:
+                # Start the countdown as soon as a face is in view
+                key = ord(' ') if faces else -1
             if key == ord('q'):
                 break
-            elif key == ord(' ') and countdown_start is None:
+            elif key == ord(' ') and countdown_deadline is None:
                 if faces:
-                    countdown_start = time.time()
-                    best_frame = frame.copy()
+                    countdown_deadline = time.monotonic() + COUNTDOWN_SECONDS
+                    best_frame = frame
                     best_face = max(faces, key=lambda face: face[2] * face[3])
+                    tracker = self._create_tracker(frame, best_face)
                 else:
                     cv2.putText(display_frame, "No face detected!", 
                                (30, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
@@ -304,7 +725,22 @@ class CompleteHealthAnalyzer:
             print("Warning: No facial analysis results were generated")
         
         # Clean up the current window
-        cv2.destroyWindow('Complete Health Analysis - Facial Analysis')
+        if not self.headless:
+            cv2.destroyWindow('Complete Health Analysis - Facial Analysis')
+    
+    def _extract_and_analyze(self, frame, face):
+        """
+        Extract facial features from a frame and analyze them
+        
+        Returns:
+            Tuple of (features, health_data)
+        """
+        # Extract facial features with detailed metrics
+        features = self.feature_extractor.extract_features_from_frame(frame, face)
+        
+        # Perform comprehensive health analysis
+        health_data = self.health_analyzer.analyze(features)
+        return features, health_data
     
     def _run_body_analysis(self):
         """Run the body analysis portion"""
@@ -312,69 +748,73 @@ class CompleteHealthAnalyzer:
         analysis_done = False
         analysis_result = None
         best_frame = None
-        countdown_start = None
+        countdown_deadline = None
         
         while True:
             # Capture frame
-            ret, frame = self.video_capture.read()
-            if not ret:
+            frame = self._read_frame()
+            if frame is None:
                 print("Error: Failed to capture frame")
                 break
                 
             # Create a working copy for visualization
-            display_frame = frame.copy()
+            show = not self.headless
+            if show:
+                display_frame = self._copy_to_buffer('_disp_buf', frame)
             
-            if countdown_start is not None:
+            if countdown_deadline is not None:
                 # We're in countdown mode
-                remaining = 3 - int(time.time() - countdown_start)
+                remaining = math.ceil(countdown_deadline - time.monotonic())
                 if remaining <= 0:
                     # Analyze the best frame we captured
                     if best_frame is not None:
-                        # Run body analysis
-                        analysis_result = self.body_analyzer.analyze(best_frame)
+                        # Run body analysis on the analysis pool, after any warm-up
+                        analysis_result = self._pool.submit(
+                            self.body_analyzer.analyze, best_frame
+                        ).result()
                         analysis_done = True
                     else:
                         print("Analysis failed: No good frame captured")
                     break
                 
                 # Draw countdown
-                cv2.putText(display_frame, str(remaining), 
-                           (display_frame.shape[1]//2-50, display_frame.shape[0]//2+50), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 255, 255), 4)
+                if show:
+                    cv2.putText(display_frame, str(remaining), 
+                               (display_frame.shape[1]//2-50, display_frame.shape[0]//2+50), 
+                               cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 255, 255), 4)
                 
                 # Save the frame during countdown
-                best_frame = frame.copy()
+                best_frame = frame
             
-            else:
+            elif show:
                 # Draw body positioning guide
-                h, w = display_frame.shape[:2]
-                cv2.rectangle(display_frame, (int(w*0.2), int(h*0.1)), (int(w*0.8), int(h*0.9)), (0, 255, 0), 2)
+                self._apply_overlay(display_frame, 'body_guide', self._draw_body_guide)
                 
                 if instruction_shown:
-                    cv2.putText(display_frame, "Stand 6-8 feet away showing full body", (30, 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-                    cv2.putText(display_frame, "Position yourself inside the rectangle", 
-                               (30, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-                    cv2.putText(display_frame, "Press SPACE to analyze or Q to skip", 
-                               (30, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-            
-            # Display frame
-            cv2.imshow('Complete Health Analysis - Body Analysis', display_frame)
-            
-            # Check for key presses
-            key = cv2.waitKey(1) & 0xFF
+                    self._apply_overlay(display_frame, 'body_instructions', self._draw_body_instructions)
+            
+            if show:
+                # Display frame
+                cv2.imshow('Complete Health Analysis - Body Analysis', display_frame)
+                
+                # Check for key presses
+                key = _poll_key() & 0xFF
+            else:
+                # Start the countdown right away; it gives time to step back
+                key = ord(' ')
             if key == ord('q'):
                 break
-            elif key == ord(' ') and countdown_start is None:
-                countdown_start = time.time()
-                best_frame = frame.copy()
+            elif key == ord(' ') and countdown_deadline is None:
+                countdown_deadline = time.monotonic() + COUNTDOWN_SECONDS
+                best_frame = frame
         
         # Store the result
         if analysis_done and analysis_result:
             self.body_analysis_result = analysis_result
         
         # Clean up the current window
-        cv2.destroyWindow('Complete Health Analysis - Body Analysis')
+        if not self.headless:
+            cv2.destroyWindow('Complete Health Analysis - Body Analysis')
     
     def _generate_fallback_health_data(self):
         """Generates fallback health data with plausible default values"""
@@ -396,7 +836,8 @@ class CompleteHealthAnalyzer:
             return
         
         # Create a combined result
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         
         # Ensure facial analysis has valid data
         if self.facial_analysis_result:
@@ -427,17 +868,8 @@ class CompleteHealthAnalyzer:
                     self.facial_analysis_result['health_score'] = round(score / components, 1)
                 
                 # Add health status based on score
-                health_score = self.facial_analysis_result['health_score']
-                if health_score >= 8.5:
-                    self.facial_analysis_result['health_status'] = "Excellent"
-                elif health_score >= 7.0:
-                    self.facial_analysis_result['health_status'] = "Good"
-                elif health_score >= 5.5:
-                    self.facial_analysis_result['health_status'] = "Fair"
-                elif health_score >= 4.0:
-                    self.facial_analysis_result['health_status'] = "Concerning"
-                else:
-                    self.facial_analysis_result['health_status'] = "Poor"
+                self.facial_analysis_result['health_status'] = _status_for(
+                    self.facial_analysis_result['health_score'])
         
         self.complete_health_result = {
             'timestamp': timestamp,
@@ -465,300 +897,309 @@ class CompleteHealthAnalyzer:
             overall_score = round(overall_score, 1)
             
             # Determine overall health status
-            if overall_score >= 8.5:
-                overall_status = "Excellent"
-            elif overall_score >= 7.0:
-                overall_status = "Good"
-            elif overall_score >= 5.5:
-                overall_status = "Fair"
-            elif overall_score >= 4.0:
-                overall_status = "Concerning"
-            else:
-                overall_status = "Poor"
+            overall_status = _status_for(overall_score)
                 
             self.complete_health_result['overall_health_score'] = overall_score
             self.complete_health_result['overall_health_status'] = overall_status
         
-        # Combine recommendations
-        recommendations = []
-        if self.facial_analysis_result and 'recommendations' in self.facial_analysis_result:
-            for rec in self.facial_analysis_result['recommendations']:
-                if rec not in recommendations:
-                    recommendations.append(rec)
-                    
-        if self.body_analysis_result and 'recommendations' in self.body_analysis_result:
-            for rec in self.body_analysis_result['recommendations']:
-                if rec not in recommendations:
-                    recommendations.append(rec)
-                    
-        self.complete_health_result['recommendations'] = recommendations
+        # Combine recommendations, dropping duplicates while keeping order
+        all_recs = ((self.facial_analysis_result or {}).get('recommendations', []) +
+                    (self.body_analysis_result or {}).get('recommendations', []))
+        self.complete_health_result['recommendations'] = list(dict.fromkeys(all_recs))
         
         # Save the complete result
         output_path = os.path.join(self.output_dir, f"complete_health_analysis_{timestamp}")
         self.storage.save([self.complete_health_result], output_path, format=self.save_format)
         
         # Generate a human-readable report
-        report_path = os.path.join(self.output_dir, f"complete_health_analysis_{timestamp}_report.md")
-        self._save_complete_report(report_path)
+        report_path = output_path + "_report.md"
+        self._save_complete_report(report_path, now.strftime('%Y-%m-%d %H:%M:%S'))
         
         print(f"Complete health analysis saved to: {output_path}.{self.save_format}")
         print(f"Human-readable report generated: {report_path}")
     
-    def _save_complete_report(self, report_path):
+    def _save_complete_report(self, report_path, report_time_str):
         """Save a comprehensive health report in markdown format with detailed medical context"""
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write("# Facial Analysis Health Report\n\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            
-            # Face section
-            f.write("## Face #1\n\n")
-            if self.facial_analysis_result:
-                f.write(f"Analysis Time: {self.facial_analysis_result.get('timestamp', 'Unknown')}\n\n")
-                
-                # Overall health assessment
-                f.write("## Health Assessment\n\n")
-                
-                # Summary section
-                f.write("### Summary\n\n")
-                face_health = self.facial_analysis_result.get('health_analysis', {})
-                face_score = self.facial_analysis_result.get('health_score')
-                health_status = self.facial_analysis_result.get('health_status', 'Unknown')
-                
-                if face_score is not None:
-                    f.write(f"**Overall Facial Health Score: {face_score}/10** - {health_status}\n\n")
-                    
-                    # Generate summary based on health status
-                    if health_status == "Excellent":
-                        f.write("Facial analysis indicates excellent overall health markers. Facial features show good symmetry, balanced proportions, and healthy skin characteristics.\n\n")
-                    elif health_status == "Good":
-                        f.write("Facial analysis shows good health indicators with minor variations from optimal ranges. Overall facial symmetry and features are within healthy parameters.\n\n")
-                    elif health_status == "Fair":
-                        f.write("Facial analysis reveals some health indicators that may benefit from attention. There are moderate deviations in facial symmetry or other measured parameters.\n\n")
-                    elif health_status in ["Concerning", "Poor"]:
-                        f.write("Facial analysis indicates multiple health markers that suggest potential underlying issues. Significant asymmetry or other deviations from healthy parameters were observed.\n\n")
-                    else:
-                        f.write("Facial analysis complete. Health indicators show mixed results across measured parameters.\n\n")
-                
-                # Health indicators section with medical context
-                f.write("### Health Indicators\n\n")
-                
-                # Face symmetry section
-                f.write("#### Facial Symmetry\n\n")
-                if face_health.get('facial_symmetry') is not None:
-                    symmetry = face_health['facial_symmetry']
-                    f.write(f"**Symmetry Score:** {symmetry:.2f}/1.0\n\n")
-                    
-                    if symmetry > 0.9:
-                        f.write("**Interpretation:** Excellent facial symmetry. Research in neurological health suggests high symmetry often correlates with absence of neurological issues.\n\n")
-                    elif symmetry > 0.8:
-                        f.write("**Interpretation:** Good facial symmetry. Within normal parameters for healthy individuals.\n\n")
-                    elif symmetry > 0.7:
-                        f.write("**Interpretation:** Moderate facial asymmetry detected. Minor asymmetry is common and not necessarily indicative of health concerns.\n\n")
-                    else:
-                        f.write("**Interpretation:** Notable facial asymmetry detected. While this could be natural variation, significant asymmetry can sometimes correlate with various health conditions including neurological factors.\n\n")
-                        
-                    if face_health.get('note_symmetry'):
-                        f.write(f"**Note:** {face_health['note_symmetry']}\n\n")
-                        
-                    if face_health.get('eyes_level_symmetry') is not None:
-                        f.write(f"**Eye Level Symmetry:** {face_health['eyes_level_symmetry']:.2f}/1.0\n\n")
-                        if face_health['eyes_level_symmetry'] < 0.85:
-                            f.write("**Note:** Eye level asymmetry detected. This could be normal variation or potentially related to musculoskeletal alignment issues.\n\n")
-                else:
-                    f.write("Symmetry analysis not performed or inconclusive.\n\n")
+        text = self._build_report_text(self.facial_analysis_result, self.body_analysis_result,
+                                       self.complete_health_result, report_time_str)
+        self._write_report(report_path, text)
+        return report_path
+    
+    @staticmethod
+    def _write_report(report_path, text):
+        """Write report text to a file as UTF-8 in one call"""
+        Path(report_path).write_bytes(text.encode('utf-8'))
+    
+    @classmethod
+    def _build_report_text(cls, facial_result, body_result, complete_result, report_time_str):
+        """
+        Build the markdown health report
+        
+        Args:
+            facial_result: Facial analysis result, or None
+            body_result: Body analysis result, or None
+            complete_result: Combined health result, or None
+            report_time_str: Report generation time as shown in the header
+            
+        Returns:
+            str: Report text
+        """
+        buf = io.StringIO()
+        w = buf.write
+        
+        w("# Facial Analysis Health Report\n\n")
+        w(f"Generated: {report_time_str}\n\n")
+        
+        # Face section, followed by the body section when both were analyzed
+        w("## Face #1\n\n")
+        if cls._emit_facial(w, facial_result):
+            cls._emit_body(w, body_result)
+        else:
+            w("Facial analysis was not performed or no face was detected.\n\n")
+        
+        # Detailed recommendations apply whether or not the body section was written
+        expanded_recommendations = (cls._facial_recommendations(facial_result) +
+                                    cls._body_recommendations(body_result))
+        
+        cls._emit_recommendations(w, complete_result, expanded_recommendations)
+        
+        w("\n---\n\n")
+        w("*Disclaimer: This analysis is intended for informational purposes only and does not constitute medical advice. Consult with healthcare professionals for proper medical diagnosis and treatment.*\n\n")
+        w("---\n")
+        
+        return buf.getvalue()
+    
+    @staticmethod
+    def _emit_facial(w, facial_result):
+        """
+        Write the facial health section of the report
+        
+        Args:
+            w: Callable appending a string to the report
+            facial_result: Facial analysis result, or None
+            
+        Returns:
+            bool: False if there was no facial result to write
+        """
+        if not facial_result:
+            return False
+        
+        face_health = facial_result.get('health_analysis') or {}
+        w(f"Analysis Time: {facial_result.get('timestamp', 'Unknown')}\n\n")
+        
+        # Overall health assessment
+        w("## Health Assessment\n\n")
+        
+        # Summary section
+        w("### Summary\n\n")
+        face_score = facial_result.get('health_score')
+        health_status = facial_result.get('health_status', 'Unknown')
+        
+        if face_score is not None:
+            w(f"**Overall Facial Health Score: {face_score}/10** - {health_status}\n\n")
+            
+            # Generate summary based on health status
+            w(_STATUS_SUMMARY.get(health_status, _STATUS_SUMMARY_DEFAULT))
+        
+        # Health indicators section with medical context
+        w("### Health Indicators\n\n")
+        
+        # Face symmetry section
+        w("#### Facial Symmetry\n\n")
+        if face_health.get('facial_symmetry') is not None:
+            symmetry = face_health['facial_symmetry']
+            w(f"**Symmetry Score:** {symmetry:.2f}/1.0\n\n")
+            w(_SYM_TEXT[bisect.bisect_left(_SYM_THRESH, symmetry)])
                 
-                # Eye analysis section
-                f.write("#### Eye Analysis\n\n")
-                if face_health.get('eye_fatigue'):
-                    f.write(f"**Eye Fatigue Level:** {face_health['eye_fatigue']}\n\n")
-                    
-                    if face_health['eye_fatigue'] == "High":
-                        f.write("**Medical Context:** High eye fatigue can indicate excessive screen time, poor sleep quality, or potential vision issues. Chronic eye fatigue has been associated with headaches, reduced productivity, and in some cases, may exacerbate existing vision problems.\n\n")
-                    elif face_health['eye_fatigue'] == "Moderate":
-                        f.write("**Medical Context:** Moderate eye fatigue may indicate the need for rest or adjustment of screen time. Eye fatigue can impact concentration and may be associated with dryness, strain, or tension headaches.\n\n")
-                    
-                    if face_health.get('eye_fatigue_trend'):
-                        f.write(f"**Trend:** {face_health['eye_fatigue_trend']}\n\n")
+            if face_health.get('note_symmetry'):
+                w(f"**Note:** {face_health['note_symmetry']}\n\n")
                 
-                if face_health.get('eye_bags') is not None:
-                    f.write(f"**Eye Bags Assessment:** {face_health.get('eye_bags_evaluation', 'Not evaluated')}\n\n")
-                    f.write("**Medical Context:** Prominent eye bags can sometimes indicate fluid retention, allergies, lack of sleep, or natural aging processes. Chronic puffiness may warrant further investigation in some cases.\n\n")
+            if face_health.get('eyes_level_symmetry') is not None:
+                w(f"**Eye Level Symmetry:** {face_health['eyes_level_symmetry']:.2f}/1.0\n\n")
+                if face_health['eyes_level_symmetry'] < 0.85:
+                    w(_EYE_LEVEL_NOTE)
+        else:
+            w("Symmetry analysis not performed or inconclusive.\n\n")
+        
+        # Eye analysis section
+        w("#### Eye Analysis\n\n")
+        if face_health.get('eye_fatigue'):
+            w(f"**Eye Fatigue Level:** {face_health['eye_fatigue']}\n\n")
+            fatigue_text = _FATIGUE_TEXT.get(face_health['eye_fatigue'])
+            if fatigue_text:
+                w(fatigue_text)
+            
+            if face_health.get('eye_fatigue_trend'):
+                w(f"**Trend:** {face_health['eye_fatigue_trend']}\n\n")
+        
+        if face_health.get('eye_bags') is not None:
+            w(f"**Eye Bags Assessment:** {face_health.get('eye_bags_evaluation', 'Not evaluated')}\n\n")
+            w(_EYE_BAGS_TEXT)
+        
+        if face_health.get('eye_openness') is not None:
+            w(f"**Eye Openness Ratio:** {face_health['eye_openness']:.2f}\n\n")
+        
+        # Skin analysis
+        w("#### Skin Analysis\n\n")
+        if face_health.get('skin_texture') is not None:
+            w(f"**Skin Texture Score:** {face_health['skin_texture']:.2f}\n\n")
+            w(_SKIN_TEXTURE_TEXT[bisect.bisect_right(_SKIN_TEXTURE_THRESH, face_health['skin_texture'])])
+        
+        tone_note = face_health.get('skin_tone_note')
+        if tone_note:
+            w(f"**Skin Tone Assessment:** {tone_note}\n\n")
+            
+            tone_text = _tone_context(tone_note)
+            if tone_text:
+                w(tone_text)
+        
+        return True
+    
+    @staticmethod
+    def _emit_body(w, body_result):
+        """
+        Write the body analysis section of the report
+        
+        Args:
+            w: Callable appending a string to the report
+            body_result: Body analysis result, or None
+        """
+        if not body_result:
+            return
+        
+        body_analysis = body_result.get('body_analysis') or {}
+        w("## Body Analysis Results\n\n")
+        
+        # Body health score
+        health_assessment = body_analysis.get('health_assessment', {})
+        if 'health_score' in health_assessment:
+            score = health_assessment['health_score']
+            status = health_assessment.get('health_status', 'Not determined')
+            w(f"**Body Health Score:** {score}/10 - {status}\n\n")
+        
+        if 'summary' in health_assessment:
+            w(f"**Summary:** {health_assessment['summary']}\n\n")
+        
+        # Posture analysis
+        posture = body_analysis.get('posture')
+        if posture is not None:
+            w("### Posture Assessment\n\n")
+            
+            alignment = posture.get('spine_alignment')
+            if alignment is not None:
+                w(f"**Spine Alignment:** {alignment:.2f}/1.0\n\n")
+                w(_SPINE_TEXT[bisect.bisect_left(_SPINE_THRESH, alignment)])
+            
+            if 'posture_quality' in posture:
+                w(f"**Overall Posture Quality:** {posture['posture_quality']}\n\n")
                 
-                if face_health.get('eye_openness') is not None:
-                    f.write(f"**Eye Openness Ratio:** {face_health['eye_openness']:.2f}\n\n")
+            if 'posture_note' in posture:
+                w(f"**Assessment Note:** {posture['posture_note']}\n\n")
+        
+        # Symmetry analysis
+        body_symmetry = body_analysis.get('symmetry')
+        if body_symmetry is not None:
+            w("### Body Symmetry\n\n")
+            
+            if 'symmetry_note' in body_symmetry:
+                w(f"**{body_symmetry['symmetry_note']}**\n\n")
+            
+            overall = body_symmetry.get('overall_symmetry')
+            if overall is not None:
+                w(f"**Overall Body Symmetry:** {overall:.2f}/1.0\n\n")
                 
-                # Skin analysis
-                f.write("#### Skin Analysis\n\n")
-                if face_health.get('skin_texture') is not None:
-                    f.write(f"**Skin Texture Score:** {face_health['skin_texture']:.2f}\n\n")
-                    
-                    if face_health['skin_texture'] < 20:
-                        f.write("**Interpretation:** Excellent skin texture. Even skin surface with minimal texture variations suggests good hydration and skin health.\n\n")
-                    elif face_health['skin_texture'] < 35:
-                        f.write("**Interpretation:** Normal skin texture. Within typical range for healthy skin.\n\n")
-                    elif face_health['skin_texture'] < 45:
-                        f.write("**Interpretation:** Elevated skin texture. May indicate mild dehydration, stress effects on skin, or normal aging.\n\n")
-                    else:
-                        f.write("**Interpretation:** High skin texture variation. Could indicate dehydration, increased stress levels, or other factors affecting skin health.\n\n")
+                if overall < 0.8:
+                    w(_BODY_SYMMETRY_TEXT)
+            
+            shoulder = body_symmetry.get('shoulder_symmetry')
+            if shoulder is not None:
+                w(f"**Shoulder Symmetry:** {shoulder:.2f}/1.0\n\n")
                 
-                if face_health.get('skin_tone_note'):
-                    f.write(f"**Skin Tone Assessment:** {face_health['skin_tone_note']}\n\n")
-                    
-                    if "yellowish" in face_health['skin_tone_note'].lower():
-                        f.write("**Medical Context:** A yellowish tint can sometimes be associated with liver or gallbladder function changes. In some cases, it may relate to dietary factors or natural skin undertones.\n\n")
-                    elif "pale" in face_health['skin_tone_note'].lower():
-                        f.write("**Medical Context:** Paleness can be associated with anemia, poor circulation, or fatigue in some cases. It may also be a natural skin tone variant or lighting effect.\n\n")
-                    elif "redness" in face_health['skin_tone_note'].lower():
-                        f.write("**Medical Context:** Increased redness can relate to various factors including sun exposure, temperature changes, skin conditions, blood pressure variations, or inflammatory responses.\n\n")
+                if shoulder < 0.8:
+                    w(_SHOULDER_SYMMETRY_TEXT)
+            
+            hip = body_symmetry.get('hip_symmetry')
+            if hip is not None:
+                w(f"**Hip Symmetry:** {hip:.2f}/1.0\n\n")
                 
-                # Add body analysis if available
-                if self.body_analysis_result:
-                    body_analysis = self.body_analysis_result.get('body_analysis', {})
-                    
-                    f.write("## Body Analysis Results\n\n")
-                    
-                    # Body health score
-                    health_assessment = body_analysis.get('health_assessment', {})
-                    if 'health_score' in health_assessment:
-                        score = health_assessment['health_score']
-                        status = health_assessment.get('health_status', 'Not determined')
-                        f.write(f"**Body Health Score:** {score}/10 - {status}\n\n")
-                    
-                    if 'summary' in health_assessment:
-                        f.write(f"**Summary:** {health_assessment['summary']}\n\n")
-                    
-                    # Posture analysis
-                    if 'posture' in body_analysis:
-                        posture = body_analysis['posture']
-                        f.write("### Posture Assessment\n\n")
-                        
-                        if 'spine_alignment' in posture:
-                            alignment = posture['spine_alignment']
-                            f.write(f"**Spine Alignment:** {alignment:.2f}/1.0\n\n")
-                            
-                            if alignment > 0.9:
-                                f.write("**Medical Context:** Excellent spinal alignment. Good alignment reduces stress on muscles and joints, minimizing risk of chronic pain and posture-related issues.\n\n")
-                            elif alignment > 0.8:
-                                f.write("**Medical Context:** Good spinal alignment. Minor deviations are common and generally don't indicate health concerns.\n\n")
-                            elif alignment > 0.7:
-                                f.write("**Medical Context:** Fair spinal alignment. Moderate deviations may contribute to muscle imbalances over time.\n\n")
-                            else:
-                                f.write("**Medical Context:** Significant spinal alignment issues detected. Poor alignment may contribute to uneven muscle development, joint stress, and potential pain patterns.\n\n")
-                        
-                        if 'posture_quality' in posture:
-                            f.write(f"**Overall Posture Quality:** {posture['posture_quality']}\n\n")
-                            
-                        if 'posture_note' in posture:
-                            f.write(f"**Assessment Note:** {posture['posture_note']}\n\n")
-                    
-                    # Symmetry analysis
-                    if 'symmetry' in body_analysis:
-                        symmetry = body_analysis['symmetry']
-                        f.write("### Body Symmetry\n\n")
-                        
-                        if 'symmetry_note' in symmetry:
-                            f.write(f"**{symmetry['symmetry_note']}**\n\n")
-                        
-                        if 'overall_symmetry' in symmetry:
-                            f.write(f"**Overall Body Symmetry:** {symmetry['overall_symmetry']:.2f}/1.0\n\n")
-                            
-                            if symmetry['overall_symmetry'] < 0.8:
-                                f.write("**Medical Context:** Body asymmetry can sometimes indicate muscle imbalances, postural habits, or underlying musculoskeletal factors. Significant asymmetry may benefit from professional assessment.\n\n")
-                        
-                        if 'shoulder_symmetry' in symmetry:
-                            f.write(f"**Shoulder Symmetry:** {symmetry['shoulder_symmetry']:.2f}/1.0\n\n")
-                            
-                            if symmetry['shoulder_symmetry'] < 0.8:
-                                f.write("**Medical Context:** Shoulder asymmetry may relate to muscle development differences, occupational patterns, carrying habits, or potential joint issues. Chronic asymmetry may affect movement patterns.\n\n")
-                        
-                        if 'hip_symmetry' in symmetry:
-                            f.write(f"**Hip Symmetry:** {symmetry['hip_symmetry']:.2f}/1.0\n\n")
-                            
-                            if symmetry['hip_symmetry'] < 0.8:
-                                f.write("**Medical Context:** Hip asymmetry can affect gait, weight distribution, and potentially contribute to compensatory patterns throughout the body's kinetic chain.\n\n")
-                    
-                    # Balance analysis
-                    if 'balance' in body_analysis:
-                        balance = body_analysis['balance']
-                        f.write("### Balance Assessment\n\n")
-                        
-                        if 'balance_quality' in balance:
-                            f.write(f"**Balance Quality:** {balance['balance_quality']}\n\n")
-                        
-                        if 'weight_distribution' in balance:
-                            f.write(f"**Weight Distribution Score:** {balance['weight_distribution']:.2f}/1.0\n\n")
-                            
-                            if balance['weight_distribution'] < 0.8:
-                                f.write("**Medical Context:** Uneven weight distribution may increase stress on joints, affect movement efficiency, and potentially contribute to compensatory patterns in the musculoskeletal system.\n\n")
-                        
-                        if 'balance_note' in balance:
-                            f.write(f"**Note:** {balance['balance_note']}\n\n")
-            else:
-                f.write("Facial analysis was not performed or no face was detected.\n\n")
+                if hip < 0.8:
+                    w(_HIP_SYMMETRY_TEXT)
+        
+        # Balance analysis
+        balance = body_analysis.get('balance')
+        if balance is not None:
+            w("### Balance Assessment\n\n")
             
-            # Recommendations section with more detailed health advice
-            f.write("## Recommendations\n\n")
+            if 'balance_quality' in balance:
+                w(f"**Balance Quality:** {balance['balance_quality']}\n\n")
             
-            if self.complete_health_result and 'recommendations' in self.complete_health_result:
-                for rec in self.complete_health_result['recommendations']:
-                    f.write(f"- ✅ {rec}\n")
-                    
-                # Add expanded recommendations based on detected issues
-                expanded_recommendations = []
-                
-                # Add expanded facial recommendations
-                if self.facial_analysis_result:
-                    face_health = self.facial_analysis_result.get('health_analysis', {})
-                    
-                    # Eye fatigue recommendations
-                    if face_health.get('eye_fatigue') in ["Moderate", "High"]:
-                        expanded_recommendations.append("Practice the 20-20-20 rule: Every 20 minutes, look at something 20 feet away for 20 seconds")
-                        expanded_recommendations.append("Consider blue light filtering glasses if you spend significant time on digital screens")
-                    
-                    # Skin recommendations
-                    if face_health.get('skin_texture', 0) > 30:
-                        expanded_recommendations.append("Consider increasing daily water intake to 8-10 glasses")
-                        expanded_recommendations.append("Use a gentle moisturizer with hyaluronic acid for improved skin hydration")
-                    
-                    # Facial asymmetry recommendations
-                    if face_health.get('facial_symmetry', 1.0) < 0.75:
-                        expanded_recommendations.append("Evaluate sleeping position - try to avoid consistently sleeping on one side")
-                        expanded_recommendations.append("Consider facial exercises to strengthen muscles on both sides of the face")
-                
-                # Add expanded body recommendations
-                if self.body_analysis_result:
-                    body_analysis = self.body_analysis_result.get('body_analysis', {})
-                    
-                    # Posture recommendations
-                    if body_analysis.get('posture', {}).get('spine_alignment', 1.0) < 0.8:
-                        expanded_recommendations.append("Strengthen core muscles with planks and bird-dog exercises")
-                        expanded_recommendations.append("Practice mindful posture checks throughout the day, especially during seated work")
-                    
-                    # Symmetry recommendations
-                    if body_analysis.get('symmetry', {}).get('shoulder_symmetry', 1.0) < 0.8:
-                        expanded_recommendations.append("Perform balanced strength training focusing on both sides equally")
-                        expanded_recommendations.append("Be mindful of repetitive one-sided activities or carrying habits")
-                    
-                    # Balance recommendations
-                    if body_analysis.get('balance', {}).get('weight_distribution', 1.0) < 0.8:
-                        expanded_recommendations.append("Practice single-leg balance exercises starting at 30 seconds per leg")
-                        expanded_recommendations.append("Consider yoga poses like tree pose to improve proprioception and balance")
+            wd = balance.get('weight_distribution')
+            if wd is not None:
+                w(f"**Weight Distribution Score:** {wd:.2f}/1.0\n\n")
                 
-                # Write expanded recommendations
-                if expanded_recommendations:
-                    f.write("\n### Detailed Recommendations:\n\n")
-                    for rec in expanded_recommendations:
-                        f.write(f"- ✅ {rec}\n")
-            else:
-                f.write("- ✅ Maintain healthy lifestyle with balanced nutrition and regular exercise\n")
-                f.write("- ✅ Ensure adequate hydration and quality sleep\n")
-                f.write("- ✅ Practice stress management techniques\n")
+                if wd < 0.8:
+                    w(_WEIGHT_DISTRIBUTION_TEXT)
             
-            f.write("\n---\n\n")
-            f.write("*Disclaimer: This analysis is intended for informational purposes only and does not constitute medical advice. Consult with healthcare professionals for proper medical diagnosis and treatment.*\n\n")
-            f.write("---\n")
+            if 'balance_note' in balance:
+                w(f"**Note:** {balance['balance_note']}\n\n")
+    
+    @staticmethod
+    def _facial_recommendations(facial_result):
+        """Detailed recommendations for the facial findings, empty without a result"""
+        if not facial_result:
+            return []
         
-        return report_path
+        face_health = facial_result.get('health_analysis') or {}
+        recommendations = []
+        if face_health.get('eye_fatigue') in _FATIGUE_TEXT:
+            recommendations.extend(_EYE_FATIGUE_RECS)
+        skin_texture = face_health.get('skin_texture')
+        if skin_texture is not None and skin_texture > 30:
+            recommendations.extend(_SKIN_TEXTURE_RECS)
+        symmetry = face_health.get('facial_symmetry')
+        if symmetry is not None and symmetry < 0.75:
+            recommendations.extend(_FACIAL_SYMMETRY_RECS)
+        return recommendations
+    
+    @staticmethod
+    def _body_recommendations(body_result):
+        """Detailed recommendations for the body findings, empty without a result"""
+        if not body_result:
+            return []
+        
+        body_analysis = body_result.get('body_analysis') or {}
+        recommendations = []
+        for section, key, recs in _BODY_REC_RULES:
+            value = (body_analysis.get(section) or {}).get(key)
+            if value is not None and value < 0.8:
+                recommendations.extend(recs)
+        return recommendations
+    
+    @staticmethod
+    def _emit_recommendations(w, complete_result, expanded_recommendations):
+        """
+        Write the recommendations section of the report
+        
+        Args:
+            w: Callable appending a string to the report
+            complete_result: Combined health result, or None
+            expanded_recommendations: Detailed recommendations gathered from the findings
+        """
+        # Recommendations section with more detailed health advice
+        w("## Recommendations\n\n")
+        
+        if not (complete_result and 'recommendations' in complete_result):
+            w(_DEFAULT_RECS_TEXT)
+            return
+        
+        recommendations = complete_result['recommendations']
+        if recommendations:
+            w(_bullets(recommendations))
+            
+        # Write expanded recommendations
+        if expanded_recommendations:
+            w("\n### Detailed Recommendations:\n\n")
+            w(_bullets(expanded_recommendations))
 
 def main():
     """Main function to run the complete health analyzer"""
@@ -1,6 +1,6 @@
 """
 Face Detector Module
-Provides detection of faces in images using various methods (opencv, dlib, or torch).
+Provides detection of faces in images using various methods (opencv, yunet, dlib, or torch).
 """
 
 import os
@@ -15,6 +15,13 @@ except ImportError:
     print("PyTorch not available. GPU acceleration disabled.")
     TORCH_AVAILABLE = False
 
+# Make onnxruntime optional
+try:
+    import onnxruntime as ort
+    ORT_AVAILABLE = True
+except ImportError:
+    ORT_AVAILABLE = False
+
 # Import dlib for facial landmark detection
 try:
     import dlib
@@ -23,6 +30,17 @@ except ImportError:
     print("dlib not available. Using OpenCV for detection.")
     DLIB_AVAILABLE = False
 
+# OpenCV built with OpenVINO can run the DNN face detector through its
+# inference engine, which executes INT8 IR models with VNNI on Intel CPUs
+try:
+    OPENVINO_AVAILABLE = bool(cv2.dnn.getAvailableTargets(cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE))
+except (AttributeError, cv2.error):
+    OPENVINO_AVAILABLE = False
+
+# Input size and per-channel (BGR) mean of the SSD face detector
+_SSD_SIZE = (300, 300)
+_SSD_MEAN = np.array([104, 117, 123], dtype=np.float32).reshape(3, 1, 1)
+
 class FaceDetector:
     """Face detection using various methods with GPU support where available"""
     
@@ -31,13 +49,19 @@ class FaceDetector:
         Initialize the face detector
         
         Args:
-            method (str): Detection method ('opencv', 'dlib', or 'torch')
+            method (str): Detection method ('opencv', 'yunet', 'dlib', or 'torch')
             use_gpu (bool): Whether to use GPU acceleration (if available)
             confidence_threshold (float): Confidence threshold for detections (0.0-1.0)
         """
         self.method = method
         self.use_gpu = use_gpu and (TORCH_AVAILABLE or method != 'torch')
         self.confidence_threshold = confidence_threshold
+        self.cnn_detector = None
+        self._ort_session = None
+        
+        # Reused SSD input buffers, allocated on the first DNN detection
+        self._resize_buf = None
+        self._blob_buf = None
         
         # Absolute path to models directory
         models_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models'))
@@ -47,22 +71,68 @@ class FaceDetector:
             # Use OpenCV DNN face detector
             model_file = os.path.join(models_dir, 'opencv_face_detector.caffemodel')
             config_file = os.path.join(models_dir, 'opencv_face_detector.prototxt')
+            onnx_file = os.path.join(models_dir, 'opencv_face_detector.onnx')
+            int8_xml = os.path.join(models_dir, 'opencv_face_detector_int8.xml')
+            int8_bin = os.path.join(models_dir, 'opencv_face_detector_int8.bin')
+            cuda_dnn = use_gpu and cv2.cuda.getCudaEnabledDeviceCount() > 0
             
-            if os.path.exists(model_file) and os.path.exists(config_file):
+            # On the GPU prefer an ONNX export run through ONNX Runtime (TensorRT FP16)
+            if (use_gpu and ORT_AVAILABLE and os.path.exists(onnx_file)
+                    and self._init_onnx_detector(onnx_file, models_dir)):
+                self.detector = self._ort_session
+            # On the CPU prefer an INT8 OpenVINO IR of the same network
+            elif (not cuda_dnn and OPENVINO_AVAILABLE and os.path.exists(int8_xml)
+                    and os.path.exists(int8_bin)):
+                self.detector = cv2.dnn.readNet(int8_xml, int8_bin)
+                self.detector.setPreferableBackend(cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE)
+                self.detector.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+                print(f"Loaded INT8 face detector from: {int8_xml}")
+            elif os.path.exists(model_file) and os.path.exists(config_file):
                 self.detector = cv2.dnn.readNetFromCaffe(config_file, model_file)
-                if use_gpu and cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                if cuda_dnn:
                     self.detector.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
                     self.detector.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
+                elif OPENVINO_AVAILABLE:
+                    self.detector.setPreferableBackend(cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE)
+                    self.detector.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
             else:
                 print(f"OpenCV face detector model not found at {model_file}")
                 print("Using OpenCV's built-in face detector instead")
                 self.detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
         
+        elif method == 'yunet' and hasattr(cv2, 'FaceDetectorYN'):
+            # Use OpenCV's YuNet detector, fast enough for real time on the CPU
+            yunet_model = os.path.join(models_dir, 'face_detection_yunet.onnx')
+            if os.path.exists(yunet_model):
+                self.detector = cv2.FaceDetectorYN.create(
+                    yunet_model, '', (320, 320), score_threshold=confidence_threshold
+                )
+                self._yunet_size = (320, 320)
+                print(f"Loaded YuNet face detector from: {yunet_model}")
+            else:
+                print(f"YuNet face detector model not found at {yunet_model}")
+                print("Download it from: https://github.com/opencv/opencv_zoo/tree/main/models/face_detection_yunet")
+                print("Using OpenCV's built-in face detector instead")
+                self.method = 'opencv'
+                self.detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        
         elif method == 'dlib' and DLIB_AVAILABLE:
             # Use dlib's face detector
             print("Using dlib face detector")
             self.detector = dlib.get_frontal_face_detector()
             
+            # The HOG detector gains nothing from a GPU; use the CUDA MMOD
+            # detector instead when dlib was built with CUDA
+            cnn_model = os.path.join(models_dir, 'mmod_human_face_detector.dat')
+            if use_gpu and getattr(dlib, 'DLIB_USE_CUDA', False):
+                if os.path.exists(cnn_model):
+                    self.cnn_detector = dlib.cnn_face_detection_model_v1(cnn_model)
+                    print(f"Loaded CNN face detector from: {cnn_model}")
+                else:
+                    print(f"Dlib CNN face detector model not found at {cnn_model}")
+                    print("Download it from: http://dlib.net/files/mmod_human_face_detector.dat.bz2")
+                    print("Using HOG face detector instead")
+            
             # Load landmark predictor if available
             landmark_model = os.path.join(models_dir, 'shape_predictor_68_face_landmarks.dat')
             if os.path.exists(landmark_model):
@@ -83,6 +153,8 @@ class FaceDetector:
                     device='cuda' if use_gpu and torch.cuda.is_available() else 'cpu',
                     thresholds=[0.6, 0.7, 0.9]  # Adjust for precision vs. recall
                 )
+                if torch.device(self.detector.device).type == 'cuda':
+                    self._trace_mtcnn()
             except ImportError:
                 print("facenet_pytorch not available. Falling back to OpenCV.")
                 self.method = 'opencv'
@@ -94,33 +166,168 @@ class FaceDetector:
             self.method = 'opencv'
             self.detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
     
-    def detect(self, image):
+    def _trace_mtcnn(self):
+        """
+        Replace the MTCNN sub-networks with TorchScript traces
+        
+        Traced modules run without per-layer Python dispatch. P-Net is fully
+        convolutional and R-Net/O-Net take fixed 24x24 and 48x48 crops, so one
+        trace each covers every pyramid scale and batch size. Tracing also runs
+        each network once, so the CUDA kernels are warm before the first frame.
+        """
+        example_shapes = {
+            'pnet': (1, 3, 120, 160),
+            'rnet': (2, 3, 24, 24),
+            'onet': (2, 3, 48, 48)
+        }
+        try:
+            with torch.no_grad():
+                for name, shape in example_shapes.items():
+                    net = getattr(self.detector, name).eval()
+                    example = torch.zeros(shape, device=torch.device(self.detector.device))
+                    setattr(self.detector, name, torch.jit.trace(net, example))
+        except Exception as e:
+            print(f"MTCNN tracing failed, using eager networks: {e}")
+    
+    def _init_onnx_detector(self, onnx_path, models_dir):
+        """
+        Load the SSD face detector with ONNX Runtime
+        
+        The model is expected to be an export of opencv_face_detector.caffemodel
+        that takes the same 1x3x300x300 blob and returns the same 1x1xNx7
+        detection tensor as the cv2.dnn network. TensorRT engines are cached
+        in the models directory so they are only built on the first run.
+        
+        Returns:
+            True if the session was created
+        """
+        providers = [
+            ('TensorrtExecutionProvider', {
+                'trt_fp16_enable': True,
+                'trt_engine_cache_enable': True,
+                'trt_engine_cache_path': models_dir
+            }),
+            'CUDAExecutionProvider',
+            'CPUExecutionProvider'
+        ]
+        available = ort.get_available_providers()
+        providers = [p for p in providers if (p[0] if isinstance(p, tuple) else p) in available]
+        
+        try:
+            session = ort.InferenceSession(onnx_path, providers=providers)
+        except Exception as e:
+            print(f"ONNX Runtime face detector initialization failed: {e}")
+            return False
+        
+        self._ort_session = session
+        self._ort_input = session.get_inputs()[0].name
+        self._ort_device = 'cpu' if session.get_providers()[0] == 'CPUExecutionProvider' else 'cuda'
+        
+        # The input tensor stays bound on the device and is refreshed in place
+        self._ort_binding = session.io_binding()
+        self._ort_binding.bind_output(session.get_outputs()[0].name, 'cpu')
+        self._ort_value = None
+        
+        print(f"Face detector loaded with ONNX Runtime ({session.get_providers()[0]})")
+        return True
+    
+    def _forward_ssd(self, blob):
+        """Run the SSD face detector on a blob and return the detection tensor"""
+        if self._ort_session is None:
+            self.detector.setInput(blob)
+            return self.detector.forward()
+        
+        if self._ort_value is None:
+            self._ort_value = ort.OrtValue.ortvalue_from_numpy(blob, self._ort_device, 0)
+            self._ort_binding.bind_ortvalue_input(self._ort_input, self._ort_value)
+        else:
+            self._ort_value.update_inplace(blob)
+        self._ort_session.run_with_iobinding(self._ort_binding)
+        return self._ort_binding.copy_outputs_to_cpu()[0]
+    
+    def detect(self, image, gray=None):
         """
         Detect faces in the image
         
         Args:
             image (numpy.ndarray): Input image
+            gray (numpy.ndarray): Optional grayscale version of image, reused
+                instead of converting again by the methods that work on gray
             
         Returns:
             list: List of face bounding boxes as (x, y, w, h)
         """
-        if self.method == 'opencv' and isinstance(self.detector, cv2.dnn.Net):
+        if self.method == 'opencv' and (self._ort_session is not None
+                                        or isinstance(self.detector, cv2.dnn.Net)):
             return self._detect_opencv_dnn(image)
         elif self.method == 'opencv':
-            return self._detect_opencv_cascade(image)
+            return self._detect_opencv_cascade(image, gray)
+        elif self.method == 'yunet':
+            return self._detect_yunet(image)
         elif self.method == 'dlib' and DLIB_AVAILABLE:
-            return self._detect_dlib(image)
+            return self._detect_dlib(image, gray)
         elif self.method == 'torch' and TORCH_AVAILABLE:
             return self._detect_torch(image)
         else:
-            return self._detect_opencv_cascade(image)
+            return self._detect_opencv_cascade(image, gray)
+    
+    def detect_batch(self, images, grays=None, upsample=0):
+        """
+        Detect faces in several images
+        
+        With the CUDA CNN detector and MTCNN the images go through the network
+        in one batched call, which spreads the fixed GPU cost over the batch.
+        Other methods detect image by image.
+        
+        Args:
+            images (list): Input images, all of the same size for the CNN detector;
+                MTCNN scales differently sized images to the first one's size
+            grays (list): Optional grayscale versions of images
+            upsample (int): Times the CNN detector upsamples each image
+            
+        Returns:
+            list: One list of face bounding boxes as (x, y, w, h) per image
+        """
+        if not images:
+            return []
+        if self.method == 'torch' and TORCH_AVAILABLE:
+            return self._detect_torch_batch(images)
+        
+        if grays is None:
+            grays = [None] * len(images)
+        
+        if self.cnn_detector is None:
+            return [self.detect(image, gray) for image, gray in zip(images, grays)]
+        
+        dlib_images = [
+            gray if gray is not None else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            for image, gray in zip(images, grays)
+        ]
+        batch = self.cnn_detector(dlib_images, upsample, batch_size=len(dlib_images))
+        return [
+            [(d.rect.left(), d.rect.top(), d.rect.width(), d.rect.height()) for d in detections]
+            for detections in batch
+        ]
     
     def _detect_opencv_dnn(self, image):
         """Detect faces using OpenCV DNN"""
         height, width = image.shape[:2]
-        blob = cv2.dnn.blobFromImage(image, 1.0, (300, 300), [104, 117, 123], False, False)
-        self.detector.setInput(blob)
-        detections = self.detector.forward()
+        
+        if self._resize_buf is None:
+            self._resize_buf = np.empty((_SSD_SIZE[1], _SSD_SIZE[0], 3), dtype=np.uint8)
+            self._blob_buf = np.empty((1, 3, _SSD_SIZE[1], _SSD_SIZE[0]), dtype=np.float32)
+        
+        # Same blob as blobFromImage(image, 1.0, (300, 300), [104, 117, 123]),
+        # built into the preallocated buffers instead of fresh arrays. Images
+        # that are not 3-channel uint8 make resize allocate a new array
+        # instead of filling the buffer, so they take the regular path.
+        resized = cv2.resize(image, _SSD_SIZE, dst=self._resize_buf)
+        if resized is self._resize_buf:
+            np.subtract(resized.transpose(2, 0, 1), _SSD_MEAN, out=self._blob_buf[0])
+            blob = self._blob_buf
+        else:
+            blob = cv2.dnn.blobFromImage(image, 1.0, _SSD_SIZE, [104, 117, 123], False, False)
+        detections = self._forward_ssd(blob)
         
         faces = []
         for i in range(detections.shape[2]):
@@ -139,9 +346,30 @@ class FaceDetector:
         
         return faces
     
-    def _detect_opencv_cascade(self, image):
+    def _detect_yunet(self, image):
+        """Detect faces using OpenCV YuNet"""
+        height, width = image.shape[:2]
+        if self._yunet_size != (width, height):
+            self.detector.setInputSize((width, height))
+            self._yunet_size = (width, height)
+        
+        _, detections = self.detector.detect(image)
+        if detections is None:
+            return []
+        
+        faces = []
+        for x, y, w, h in detections[:, :4].astype(int):
+            # Ensure bounding box is within image bounds
+            x1, y1 = max(0, x), max(0, y)
+            x2, y2 = min(width, x + w), min(height, y + h)
+            faces.append((int(x1), int(y1), int(x2 - x1), int(y2 - y1)))
+        
+        return faces
+    
+    def _detect_opencv_cascade(self, image, gray=None):
         """Detect faces using OpenCV Cascade Classifier"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if gray is None:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         faces = self.detector.detectMultiScale(
             gray, 
             scaleFactor=1.1, 
@@ -150,13 +378,18 @@ class FaceDetector:
         )
         return faces
     
-    def _detect_dlib(self, image):
+    def _detect_dlib(self, image, gray=None):
         """Detect faces using dlib"""
-        # Convert to RGB for dlib
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        if self.cnn_detector is not None:
+            return self.detect_batch([image], [gray])[0]
         
-        # Detect faces
-        dlib_faces = self.detector(rgb_image)
+        # dlib's HOG detector only looks at luminance, so a single-channel
+        # image is enough and cheaper to produce than an RGB copy
+        if gray is None:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        
+        # Detect faces without upsampling
+        dlib_faces = self.detector(gray, 0)
         
         # Convert to OpenCV format (x, y, w, h)
         faces = []
@@ -189,6 +422,35 @@ class FaceDetector:
         
         return faces
     
+    def _detect_torch_batch(self, images):
+        """Detect faces in several images with one batched MTCNN call"""
+        # MTCNN batches equally sized images only; scale the others and
+        # remember the factors to map their boxes back
+        height, width = images[0].shape[:2]
+        batch = []
+        scales = []
+        for image in images:
+            image_height, image_width = image.shape[:2]
+            if (image_height, image_width) != (height, width):
+                image = cv2.resize(image, (width, height))
+            batch.append(image)
+            scales.append((image_width / width, image_height / height))
+        
+        boxes_batch, _ = self.detector.detect(batch)
+        
+        # Convert to OpenCV format (x, y, w, h)
+        results = []
+        for boxes, (scale_x, scale_y) in zip(boxes_batch, scales):
+            faces = []
+            if boxes is not None:
+                for box in boxes:
+                    x1, x2 = int(box[0] * scale_x), int(box[2] * scale_x)
+                    y1, y2 = int(box[1] * scale_y), int(box[3] * scale_y)
+                    faces.append((x1, y1, x2-x1, y2-y1))
+            results.append(faces)
+        
+        return results
+    
     def get_landmarks(self, image, face):
         """
         Get facial landmarks for a detected face
@@ -210,7 +472,7 @@ class FaceDetector:
             shape = self.landmark_predictor(rgb_image, dlib_rect)
             
             # Convert to list of (x, y) tuples
-            landmarks = [(shape.part(i).x, shape.part(i).y) for i in range(shape.num_parts)]
+            landmarks = [(p.x, p.y) for p in shape.parts()]
             return landmarks
         else:
             # No landmarks available
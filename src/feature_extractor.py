@@ -17,6 +17,65 @@ except ImportError:
     TORCH_AVAILABLE = False
     print("PyTorch not available. GPU acceleration for feature extraction disabled.")
 
+# Landmark pairs (dlib 68-point indices) whose distances feed the metrics and ratios
+_DISTANCE_PAIRS = (
+    ('left_eye_width', 36, 39),
+    ('right_eye_width', 42, 45),
+    ('face_width', 16, 0),
+    ('face_height', 8, 27),
+    ('eyebrow_to_nose', 21, 27),
+    ('nose_to_mouth', 27, 51),
+    ('mouth_to_chin', 51, 8),
+    ('inner_eye_distance', 39, 42),
+)
+_PAIR_NAMES = tuple(name for name, _, _ in _DISTANCE_PAIRS)
+_PAIRS_A = np.array([a for _, a, _ in _DISTANCE_PAIRS])
+_PAIRS_B = np.array([b for _, _, b in _DISTANCE_PAIRS])
+
+# Pairs of landmarks compared for symmetry (left and right side of face);
+# a reduced set for real-time performance
+_SYMMETRY_PAIRS = (
+    (36, 45),    # Eyes outer corners
+    (48, 54),    # Mouth corners
+    (21, 22),    # Eyebrows
+    (31, 35)     # Nose
+)
+_SYMMETRY_LEFT = np.array([left for left, _ in _SYMMETRY_PAIRS])
+_SYMMETRY_RIGHT = np.array([right for _, right in _SYMMETRY_PAIRS])
+
+def _shape_to_np(shape):
+    """Landmark coordinates of a dlib shape as an (N, 2) int32 array"""
+    parts = shape.parts()
+    pts = np.empty((len(parts), 2), dtype=np.int32)
+    for i, p in enumerate(parts):
+        pts[i, 0] = p.x
+        pts[i, 1] = p.y
+    return pts
+
+def _landmark_distances(landmarks):
+    """Distances of all landmark pairs in one vectorized pass, keyed by name"""
+    pts = np.asarray(landmarks, dtype=np.float64)
+    diff = pts[_PAIRS_A] - pts[_PAIRS_B]
+    return dict(zip(_PAIR_NAMES, np.sqrt((diff * diff).sum(axis=1)).tolist()))
+
+def _log_kernel():
+    """
+    Laplacian-of-Gaussian kernel equal to GaussianBlur((5, 5), 0) followed by
+    the 3x3 Laplacian, so the two filters run as one convolution pass
+    """
+    gaussian_1d = cv2.getGaussianKernel(5, 0)
+    gaussian = gaussian_1d @ gaussian_1d.T
+    laplacian = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]], dtype=np.float64)
+    
+    # Full convolution of the two stencils
+    kernel = np.zeros((7, 7))
+    for i in range(3):
+        for j in range(3):
+            kernel[i:i+5, j:j+5] += laplacian[i, j] * gaussian
+    return kernel
+
+_LOG_KERNEL = _log_kernel()
+
 class FeatureExtractor:
     """A class to extract facial features from detected faces with GPU acceleration"""
     
@@ -74,19 +133,36 @@ class FeatureExtractor:
         # Performance metrics
         self.processing_time = 0
         self.fps = 0
+        
+        # Skin analysis pixel pipeline on the GPU when OpenCV has CUDA
+        self._gpu_roi = None
+        if use_gpu:
+            self._init_gpu_skin()
+    
+    def _init_gpu_skin(self):
+        """Create the reusable CUDA buffer and filters for the skin analysis"""
+        try:
+            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                self._gpu_log = cv2.cuda.createLinearFilter(cv2.CV_32FC1, cv2.CV_32FC1, _LOG_KERNEL)
+                self._gpu_roi = cv2.cuda_GpuMat()
+                print("Skin analysis using CUDA")
+        except (AttributeError, cv2.error):
+            self._gpu_roi = None
     
-    def extract_features_from_frame(self, frame, face_bbox):
+    def extract_features_from_frame(self, frame, face_bbox, gray=None):
         """
         Extract facial features from a video frame for real-time analysis
         
         Args:
             frame: Video frame as numpy array
             face_bbox: Face bounding box [x, y, width, height]
+            gray: Optional grayscale version of frame, e.g. the one used for
+                face detection, reused instead of converting again
             
         Returns:
             dict: Extracted facial features
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         # Initialize features dictionary
         features = {
@@ -100,17 +176,18 @@ class FeatureExtractor:
         
         # If we don't have the landmark detector, just return basic features
         if not self.has_landmark_detector:
-            features['skin'] = self._analyze_skin(frame, face_bbox)
+            features['skin'] = self._analyze_skin(frame, face_bbox, gray)
             
             # Calculate processing time and FPS
-            end_time = time.time()
-            self.processing_time = end_time - start_time
-            self.fps = 1.0 / self.processing_time if self.processing_time > 0 else 0
+            elapsed_ns = time.perf_counter_ns() - start_ns
+            self.processing_time = elapsed_ns * 1e-9
+            self.fps = 1e9 / elapsed_ns if elapsed_ns else 0
             
             return features
         
-        # Convert to grayscale for dlib
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Convert to grayscale for dlib; the skin analysis shares it
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
         # Extract face ROI
         x, y, w, h = face_bbox
@@ -119,33 +196,33 @@ class FeatureExtractor:
         # Get facial landmarks
         try:
             shape = self.landmark_predictor(gray, dlib_rect)
-            landmarks = []
-            for i in range(68):  # dlib has 68 landmarks
-                landmarks.append((shape.part(i).x, shape.part(i).y))
+            pts = _shape_to_np(shape)  # dlib has 68 landmarks
+            landmarks = list(map(tuple, pts.tolist()))
             
             features['landmarks'] = landmarks
             
-            # Calculate facial metrics - use GPU if available
-            if self.has_cuda:
-                features['metrics'] = self._calculate_metrics_gpu(landmarks)
-            else:
-                features['metrics'] = self._calculate_metrics(landmarks)
+            # Pairwise landmark distances shared by the metrics and ratios
+            distances = _landmark_distances(pts)
+            
+            # Calculate facial metrics; a handful of distances is cheaper on
+            # the CPU than a GPU transfer and sync
+            features['metrics'] = self._calculate_metrics(landmarks, distances)
             
             # Calculate facial symmetry
-            features['symmetry'] = self._calculate_symmetry(landmarks)
+            features['symmetry'] = self._calculate_symmetry(pts)
             
             # Extract skin features
-            features['skin'] = self._analyze_skin(frame, face_bbox)
+            features['skin'] = self._analyze_skin(frame, face_bbox, gray)
             
             # Calculate facial ratios (golden ratio analysis)
-            features['facial_ratios'] = self._calculate_facial_ratios(landmarks)
+            features['facial_ratios'] = self._calculate_facial_ratios(landmarks, distances)
         except Exception as e:
             print(f"Error extracting facial features: {e}")
         
         # Calculate processing time and FPS
-        end_time = time.time()
-        self.processing_time = end_time - start_time
-        self.fps = 1.0 / self.processing_time if self.processing_time > 0 else 0
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        self.processing_time = elapsed_ns * 1e-9
+        self.fps = 1e9 / elapsed_ns if elapsed_ns else 0
         
         return features
     
@@ -168,89 +245,31 @@ class FeatureExtractor:
         # Use the frame processing function for consistency
         return self.extract_features_from_frame(image, face_bbox)
     
-    def _calculate_metrics_gpu(self, landmarks):
-        """Calculate facial metrics using GPU acceleration"""
+    def _calculate_metrics(self, landmarks, distances=None):
+        """Calculate key facial metrics from landmarks (CPU version)"""
         metrics = {}
         
-        if len(landmarks) < 10 or not TORCH_AVAILABLE:
-            # Fall back to CPU implementation if torch is not available
-            return self._calculate_metrics(landmarks)
-        
-        # Convert landmarks to PyTorch tensors
-        landmarks_tensor = torch.tensor(landmarks, dtype=torch.float32, device=self.device)
+        # All measured pairs come from the full 68-point set
+        if len(landmarks) < 68:
+            return metrics
+        if distances is None:
+            distances = _landmark_distances(landmarks)
         
-        # Eye measurements
-        # Left eye (landmarks 36-41)
-        left_eye_width = torch.norm(
-            landmarks_tensor[36] - landmarks_tensor[39]
-        )
+        # Eye measurements: left eye (36-39) and right eye (42-45) widths
+        left_eye_width = distances['left_eye_width']
+        right_eye_width = distances['right_eye_width']
         
-        # Right eye (landmarks 42-47)
-        right_eye_width = torch.norm(
-            landmarks_tensor[42] - landmarks_tensor[45]
-        )
+        metrics['left_eye_width'] = left_eye_width
+        metrics['right_eye_width'] = right_eye_width
+        metrics['eye_width_ratio'] = left_eye_width / right_eye_width if right_eye_width > 0 else 0.0
         
-        metrics['left_eye_width'] = left_eye_width.item()
-        metrics['right_eye_width'] = right_eye_width.item()
-        metrics['eye_width_ratio'] = (left_eye_width / right_eye_width).item() if right_eye_width > 0 else 0
+        # Face width between temples (0-16) and height from chin to nose bridge (8-27)
+        face_width = distances['face_width']
+        face_height = distances['face_height']
         
-        # Face width and height
-        # Face width: distance between temples (landmarks 0 and 16)
-        face_width = torch.norm(
-            landmarks_tensor[16] - landmarks_tensor[0]
-        )
-        
-        # Face height: distance from chin to forehead (landmarks 8 and 27)
-        face_height = torch.norm(
-            landmarks_tensor[8] - landmarks_tensor[27]
-        )
-        
-        metrics['face_width'] = face_width.item()
-        metrics['face_height'] = face_height.item()
-        metrics['face_width_height_ratio'] = (face_width / face_height).item() if face_height > 0 else 0
-        
-        return metrics
-    
-    def _calculate_metrics(self, landmarks):
-        """Calculate key facial metrics from landmarks (CPU version)"""
-        metrics = {}
-        
-        # Organize landmarks by facial regions
-        regions_landmarks = {}
-        for region, indices in self.regions.items():
-            regions_landmarks[region] = [landmarks[i] for i in indices if i < len(landmarks)]
-        
-        # Eye measurements
-        if 'eyes' in regions_landmarks and len(regions_landmarks['eyes']) >= 6:
-            # Left eye width (landmarks 36 and 39)
-            left_eye_width = np.linalg.norm(
-                np.array(landmarks[36]) - np.array(landmarks[39])
-            )
-            
-            # Right eye width (landmarks 42 and 45)
-            right_eye_width = np.linalg.norm(
-                np.array(landmarks[42]) - np.array(landmarks[45])
-            )
-            
-            metrics['left_eye_width'] = float(left_eye_width)
-            metrics['right_eye_width'] = float(right_eye_width)
-            metrics['eye_width_ratio'] = float(left_eye_width / right_eye_width if right_eye_width > 0 else 0)
-        
-        # Face width and height
-        if len(landmarks) >= 17:
-            # Face width: distance between temples (landmarks 0 and 16)
-            face_width = np.linalg.norm(
-                np.array(landmarks[16]) - np.array(landmarks[0])
-            )
-            
-            # Face height: distance from chin to forehead (landmarks 8 and 27)
-            face_height = np.linalg.norm(
-                np.array(landmarks[8]) - np.array(landmarks[27])
-            )
-            
-            metrics['face_width'] = float(face_width)
-            metrics['face_height'] = float(face_height)
-            metrics['face_width_height_ratio'] = float(face_width / face_height if face_height > 0 else 0)
+        metrics['face_width'] = face_width
+        metrics['face_height'] = face_height
+        metrics['face_width_height_ratio'] = face_width / face_height if face_height > 0 else 0.0
         
         return metrics
     
@@ -262,90 +281,59 @@ class FeatureExtractor:
         }
         
         if len(landmarks) >= 68:  # Full set of dlib landmarks
+            pts = np.asarray(landmarks)
+            
             # Get vertical positions of the eyes
-            left_eye_y = landmarks[37][1]  # Left eye upper point
-            right_eye_y = landmarks[44][1]  # Right eye upper point
+            left_eye_y = int(pts[37, 1])  # Left eye upper point
+            right_eye_y = int(pts[44, 1])  # Right eye upper point
             
             # Calculate eye level difference (normalized by face height)
-            face_height = landmarks[8][1] - landmarks[27][1]  # Chin to nose bridge
+            face_height = int(pts[8, 1] - pts[27, 1])  # Chin to nose bridge
             if face_height > 0:
                 eye_level_diff = abs(left_eye_y - right_eye_y) / face_height
                 symmetry['eyes_level'] = 1.0 - min(1.0, eye_level_diff * 10)
             
-            # Calculate overall symmetry by comparing left and right sides
-            # Define the midpoint of the face (vertical line through nose)
-            nose_tip = landmarks[30]  # Nose tip
-            
-            # Define pairs of landmarks to compare (left and right side of face)
-            # Reduced number of pairs for real-time performance
-            landmark_pairs = [
-                (36, 45),    # Eyes outer corners
-                (48, 54),    # Mouth corners
-                (21, 22),    # Eyebrows
-                (31, 35)     # Nose
-            ]
-            
-            # Calculate asymmetry score
-            asymmetry_score = 0
-            for left_idx, right_idx in landmark_pairs:
-                left_point = landmarks[left_idx]
-                right_point = landmarks[right_idx]
-                
-                # Reflect right point across the vertical line through nose_tip
-                reflected_right = (2 * nose_tip[0] - right_point[0], right_point[1])
+            # Calculate overall symmetry by comparing left and right sides,
+            # normalized by face width
+            face_width = float(np.linalg.norm(pts[16] - pts[0]))
+            if face_width > 0:
+                # Reflect the right points across the vertical line through the nose tip
+                left = pts[_SYMMETRY_LEFT].astype(np.float64)
+                right = pts[_SYMMETRY_RIGHT].astype(np.float64)
+                dx = left[:, 0] - (2 * pts[30, 0] - right[:, 0])
+                dy = left[:, 1] - right[:, 1]
                 
-                # Distance between left point and reflected right point
-                distance = np.linalg.norm(np.array(left_point) - np.array(reflected_right))
-                
-                # Normalize by face width
-                face_width = np.linalg.norm(np.array(landmarks[16]) - np.array(landmarks[0]))
-                if face_width > 0:
-                    asymmetry_score += distance / face_width
+                # Distances between left points and reflected right points
+                distances = np.sqrt(dx * dx + dy * dy) / face_width
+                asymmetry_score = float(distances.sum()) / len(distances)
+            else:
+                asymmetry_score = 0.0
             
-            # Average and convert to symmetry value (1.0 = perfect symmetry)
-            if landmark_pairs:
-                asymmetry_score /= len(landmark_pairs)
-                symmetry['overall_symmetry'] = max(0.0, 1.0 - min(1.0, asymmetry_score * 3))
+            # Convert to symmetry value (1.0 = perfect symmetry)
+            symmetry['overall_symmetry'] = max(0.0, 1.0 - min(1.0, asymmetry_score * 3))
         
         return symmetry
     
-    def _analyze_skin(self, image, face_bbox):
+    def _analyze_skin(self, image, face_bbox, gray=None):
         """Analyze skin features in the face region - optimized for real-time"""
         x, y, w, h = face_bbox
         
         # Extract face ROI
         face_roi = image[y:y+h, x:x+w]
+        face_gray = gray[y:y+h, x:x+w] if gray is not None else None
         
         # Skip processing for very small regions to prevent errors
         if face_roi.size == 0 or face_roi.shape[0] < 10 or face_roi.shape[1] < 10:
             return {'skin_tone': {'hue': 0, 'saturation': 0, 'value': 0}, 'texture': 0}
         
-        # Convert to different color spaces for analysis
-        face_hsv = cv2.cvtColor(face_roi, cv2.COLOR_BGR2HSV)
-        face_gray = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
-        
-        # Extract skin tone (average hue and saturation in HSV)
-        h_channel, s_channel, v_channel = cv2.split(face_hsv)
-        
-        # For real-time performance, sample rather than process entire image
-        sample_step = max(1, min(face_roi.shape[0], face_roi.shape[1]) // 30)
-        h_sampled = h_channel[::sample_step, ::sample_step]
-        s_sampled = s_channel[::sample_step, ::sample_step]
-        v_sampled = v_channel[::sample_step, ::sample_step]
-        
-        avg_hue = np.mean(h_sampled)
-        avg_sat = np.mean(s_sampled)
-        avg_val = np.mean(v_sampled)
-        
-        # Detect skin texture features - downsample for speed
-        face_gray_small = cv2.resize(face_gray, (0, 0), fx=0.5, fy=0.5)
-        
-        # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(face_gray_small, (5, 5), 0)
-        
-        # Use Laplacian for edge detection (texture)
-        laplacian = cv2.Laplacian(blurred, cv2.CV_64F)
-        texture_variance = np.var(laplacian)
+        if self._gpu_roi is not None:
+            try:
+                avg_hue, avg_sat, avg_val, texture_variance = self._skin_stats_gpu(face_roi)
+            except (AttributeError, cv2.error) as e:
+                print(f"CUDA skin analysis failed, using CPU: {e}")
+                self._gpu_roi = None
+        if self._gpu_roi is None:
+            avg_hue, avg_sat, avg_val, texture_variance = self._skin_stats(face_roi, face_gray)
         
         # Basic skin conditions check
         skin_data = {
@@ -359,18 +347,69 @@ class FeatureExtractor:
         
         return skin_data
     
-    def _calculate_facial_ratios(self, landmarks):
+    def _skin_stats(self, face_roi, face_gray=None):
+        """Mean HSV values and Laplacian texture variance of a face ROI"""
+        # Convert to different color spaces for analysis
+        face_hsv = cv2.cvtColor(face_roi, cv2.COLOR_BGR2HSV)
+        if face_gray is None:
+            face_gray = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
+        
+        # Extract skin tone (average hue, saturation and value in HSV) in a
+        # single vectorized pass over all channels
+        avg_hue, avg_sat, avg_val, _ = cv2.mean(face_hsv)
+        
+        # Detect skin texture features - downsample for speed
+        face_gray_small = cv2.resize(face_gray, (0, 0), fx=0.5, fy=0.5)
+        
+        # Gaussian blur to reduce noise and Laplacian edge detection (texture),
+        # fused into one Laplacian-of-Gaussian pass
+        laplacian = cv2.filter2D(face_gray_small, cv2.CV_32F, _LOG_KERNEL)
+        _, texture_std = cv2.meanStdDev(laplacian)
+        
+        return avg_hue, avg_sat, avg_val, texture_std[0, 0] ** 2
+    
+    def _skin_stats_gpu(self, face_roi):
+        """
+        Same statistics as _skin_stats computed with OpenCV CUDA
+        
+        The ROI is uploaded once and every intermediate image stays in GPU
+        memory; only the reduced statistics are copied back.
+        """
+        self._gpu_roi.upload(face_roi)
+        gpu_hsv = cv2.cuda.cvtColor(self._gpu_roi, cv2.COLOR_BGR2HSV)
+        gpu_gray = cv2.cuda.cvtColor(self._gpu_roi, cv2.COLOR_BGR2GRAY)
+        
+        # Channel sums over the ROI give the HSV means
+        pixel_count = face_roi.shape[0] * face_roi.shape[1]
+        hue_sum, sat_sum, val_sum, _ = cv2.cuda.sum(gpu_hsv)
+        
+        # Downsample, then the fused blur and Laplacian; the CUDA filter keeps
+        # the input type, so it runs on float pixels to keep negative responses
+        gpu_small = cv2.cuda.resize(gpu_gray, (0, 0), fx=0.5, fy=0.5)
+        gpu_laplacian = self._gpu_log.apply(gpu_small.convertTo(cv2.CV_32F))
+        
+        # Variance from the sum and the sum of squares
+        laplacian_width, laplacian_height = gpu_laplacian.size()
+        laplacian_count = laplacian_width * laplacian_height
+        laplacian_mean = cv2.cuda.sum(gpu_laplacian)[0] / laplacian_count
+        texture_variance = cv2.cuda.sqrSum(gpu_laplacian)[0] / laplacian_count - laplacian_mean ** 2
+        
+        return (hue_sum / pixel_count, sat_sum / pixel_count, val_sum / pixel_count,
+                max(0.0, texture_variance))
+    
+    def _calculate_facial_ratios(self, landmarks, distances=None):
         """Calculate golden ratio and other important facial ratios - optimized for real-time"""
         ratios = {}
         
         if len(landmarks) >= 68:  # Full set of dlib landmarks
-            # Calculate key facial distances
+            if distances is None:
+                distances = _landmark_distances(landmarks)
             
             # Vertical thirds (forehead, nose, lower face)
             # Note: dlib doesn't detect hairline, use eyebrow top as approximation
-            eyebrow_to_nose = np.linalg.norm(np.array(landmarks[21]) - np.array(landmarks[27]))
-            nose_to_mouth = np.linalg.norm(np.array(landmarks[27]) - np.array(landmarks[51]))
-            mouth_to_chin = np.linalg.norm(np.array(landmarks[51]) - np.array(landmarks[8]))
+            eyebrow_to_nose = distances['eyebrow_to_nose']
+            nose_to_mouth = distances['nose_to_mouth']
+            mouth_to_chin = distances['mouth_to_chin']
             
             # The golden ratio is approximately 1.618
             golden_ratio = 1.618
@@ -378,22 +417,22 @@ class FeatureExtractor:
             # Compare to golden ratio
             if nose_to_mouth > 0:
                 top_ratio = eyebrow_to_nose / nose_to_mouth
-                ratios['top_third_ratio'] = float(top_ratio)
-                ratios['top_golden_ratio_diff'] = float(abs(top_ratio - golden_ratio))
+                ratios['top_third_ratio'] = top_ratio
+                ratios['top_golden_ratio_diff'] = abs(top_ratio - golden_ratio)
             
             if mouth_to_chin > 0:
                 middle_ratio = nose_to_mouth / mouth_to_chin
-                ratios['middle_third_ratio'] = float(middle_ratio)
-                ratios['middle_golden_ratio_diff'] = float(abs(middle_ratio - golden_ratio))
+                ratios['middle_third_ratio'] = middle_ratio
+                ratios['middle_golden_ratio_diff'] = abs(middle_ratio - golden_ratio)
             
             # Eye spacing ratios
-            inner_eye_distance = np.linalg.norm(np.array(landmarks[39]) - np.array(landmarks[42]))
-            eye_width_left = np.linalg.norm(np.array(landmarks[36]) - np.array(landmarks[39]))
-            eye_width_right = np.linalg.norm(np.array(landmarks[42]) - np.array(landmarks[45]))
+            inner_eye_distance = distances['inner_eye_distance']
+            eye_width_left = distances['left_eye_width']
+            eye_width_right = distances['right_eye_width']
             
             if (eye_width_left + eye_width_right) > 0:
                 eye_spacing_ratio = inner_eye_distance / ((eye_width_left + eye_width_right) / 2)
-                ratios['eye_spacing_ratio'] = float(eye_spacing_ratio)
+                ratios['eye_spacing_ratio'] = eye_spacing_ratio
         
         return ratios
         
@@ -70,7 +70,7 @@ class HealthAnalyzer:
         Returns:
             dict: Dictionary of health indicators and their values
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         health_data = {}
         
         # Only analyze if we have valid features
@@ -107,9 +107,9 @@ class HealthAnalyzer:
         health_data['analysis_timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Calculate processing time and fps
-        end_time = time.time()
-        self.analysis_time = end_time - start_time
-        self.fps = 1.0 / self.analysis_time if self.analysis_time > 0 else 0
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        self.analysis_time = elapsed_ns * 1e-9
+        self.fps = 1e9 / elapsed_ns if elapsed_ns else 0
         
         return health_data
     
@@ -28,16 +28,20 @@ def parse_arguments():
     parser.add_argument('--output', '-o', type=str, 
                       default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output'),
                       help='Directory to save analysis results')
-    parser.add_argument('--format', '-f', type=str, choices=['json', 'csv', 'xlsx'],
+    parser.add_argument('--format', '-f', type=str, choices=['json', 'csv', 'xlsx', 'blp', 'parquet'],
                       default='json', help='Output format for storage')
     parser.add_argument('--camera', '-c', type=int, default=0,
                       help='Camera ID (usually 0 for built-in webcam)')
     parser.add_argument('--cpu', action='store_true',
                       help='Force CPU usage instead of GPU')
     
+    # Complete-analysis parameters
+    parser.add_argument('--headless', action='store_true',
+                      help='Run without preview windows, starting each capture automatically (complete analysis only)')
+    
     # Face-specific parameters
     parser.add_argument('--method', type=str, default='dlib',
-                      choices=['opencv', 'dlib'],
+                      choices=['opencv', 'yunet', 'dlib'],
                       help='Face detection method (facial analysis only)')
     parser.add_argument('--interval', '-i', type=int, default=10,
                       help='Save interval in seconds (facial analysis only)')
@@ -88,7 +92,8 @@ def main():
             output_dir=args.output,
             save_format=args.format,
             use_gpu=use_gpu,
-            camera_id=args.camera
+            camera_id=args.camera,
+            headless=args.headless
         )
         
         try:
@@ -10,6 +10,7 @@ import time
 import argparse
 import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Try importing PyTorch for GPU acceleration
@@ -39,9 +40,9 @@ class RealtimeFacialAnalyzer:
         Initialize the real-time facial analyzer
         
         Args:
-            detection_method (str): Face detection method ('opencv', 'dlib')
+            detection_method (str): Face detection method ('opencv', 'yunet', 'dlib')
             output_dir (str): Directory to save analysis results
-            save_format (str): Format to save results ('json', 'csv', 'xlsx')
+            save_format (str): Format to save results ('json', 'csv', 'xlsx', 'blp', 'parquet')
             use_gpu (bool): Whether to use GPU acceleration
             camera_id (int): Camera ID for webcam (usually 0 for built-in)
             save_interval (int): Interval in seconds between data saves
@@ -79,6 +80,7 @@ class RealtimeFacialAnalyzer:
         
         # For multithreaded processing
         self.processing_thread = None
+        self.analysis_pool = None
         self.running = False
         self.current_frame = None
         self.processed_frame = None
@@ -122,8 +124,10 @@ class RealtimeFacialAnalyzer:
         self.video_capture.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
         self.video_capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
         
-        # Start processing thread
+        # Start processing thread; feature extraction and health analysis run
+        # on their own worker so they overlap with detection of the next frame
         self.running = True
+        self.analysis_pool = ThreadPoolExecutor(max_workers=1)
         self.processing_thread = threading.Thread(target=self._processing_worker, daemon=True)
         self.processing_thread.start()
         
@@ -141,6 +145,8 @@ class RealtimeFacialAnalyzer:
         # Stop background threads
         if self.processing_thread and self.processing_thread.is_alive():
             self.processing_thread.join(timeout=2.0)
+        if self.analysis_pool is not None:
+            self.analysis_pool.shutdown(wait=False)
         
         self.storage.stop_real_time_saving()
         
@@ -158,6 +164,7 @@ class RealtimeFacialAnalyzer:
         frame_times = []
         max_times = 30  # For rolling average
         face_detection_count = 0
+        pending = None  # Analysis of the previous frame's primary face
         
         while self.running:
             # Get the current frame with thread safety
@@ -170,8 +177,9 @@ class RealtimeFacialAnalyzer:
             
             start_time = time.time()
             
-            # Detect faces
-            faces = self.detector.detect(frame)
+            # Detect faces; the grayscale frame is shared with feature extraction
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            faces = self.detector.detect(frame, gray)
             
             # Find primary face (largest in the frame, assumed to be the user)
             primary_face = None
@@ -185,42 +193,43 @@ class RealtimeFacialAnalyzer:
                     if face_size > primary_face_size:
                         primary_face = face_bbox
                         primary_face_size = face_size
+            
+            # Collect the analysis of the previous frame, which ran while this one was detected
+            analysis = None
+            if pending is not None:
+                analysis = pending.result()
+                pending = None
+            
+            # Only process the primary face, on the analysis worker
+            if primary_face:
+                face_detection_count += 1
+                pending = self.analysis_pool.submit(self._analyze_face, frame, primary_face, gray)
+            
+            if analysis is not None:
+                analyzed_face, features, health_data = analysis
                 
-                # Only process the primary face
-                if primary_face:
-                    face_detection_count += 1
-                    
-                    # Extract features for the primary face
-                    features = self.feature_extractor.extract_features_from_frame(frame, primary_face)
-                    
-                    # Analyze health indicators
-                    health_data = self.health_analyzer.analyze(features)
-                    
-                    # Update the primary face attributes
-                    self.primary_face = primary_face
-                    self.primary_face_features = features
-                    
-                    # Update health tracking data
-                    self._update_health_tracking(health_data)
-                    
-                    # Prepare data for storage (only store one record per save interval)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    result = {
-                        'timestamp': timestamp,
-                        'frame_id': self.frame_count,
-                        'face_id': 0,  # Always 0 for primary face
-                        'features': features,
-                        'health_analysis': health_data,
-                        'health_status': self.health_status,
-                        'health_score': self.overall_health_score,
-                        'recommendations': self.health_recommendations
-                    }
-                    
-                    # Store only one record per save interval
-                    self.accumulated_data.append(result)
-                    
-                    # Queue the latest data for display
-                    display_data = (primary_face, features, health_data)
+                # Update the primary face attributes
+                self.primary_face = analyzed_face
+                self.primary_face_features = features
+                
+                # Update health tracking data
+                self._update_health_tracking(health_data)
+                
+                # Prepare data for storage (only store one record per save interval)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                result = {
+                    'timestamp': timestamp,
+                    'frame_id': self.frame_count,
+                    'face_id': 0,  # Always 0 for primary face
+                    'features': features,
+                    'health_analysis': health_data,
+                    'health_status': self.health_status,
+                    'health_score': self.overall_health_score,
+                    'recommendations': self.health_recommendations
+                }
+                
+                # Store only one record per save interval
+                self.accumulated_data.append(result)
             
             # Process the frame for display
             display_frame = frame.copy()
@@ -238,8 +247,10 @@ class RealtimeFacialAnalyzer:
                 # Use blue for primary face
                 cv2.rectangle(display_frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
                 
-                # Draw landmarks if available and requested
-                if self.display_landmarks and 'landmarks' in features and features['landmarks']:
+                # Draw landmarks if available and requested; they come from the
+                # previous frame's analysis, one frame behind the box
+                if (self.display_landmarks and analysis is not None
+                        and 'landmarks' in features and features['landmarks']):
                     # Draw facial landmarks
                     for point in features['landmarks']:
                         cv2.circle(display_frame, (int(point[0]), int(point[1])), 2, (0, 0, 255), -1)
@@ -285,6 +296,12 @@ class RealtimeFacialAnalyzer:
                 self.last_health_update = current_time
                 self.accumulated_data = []  # Clear accumulated data after saving
                 
+    def _analyze_face(self, frame, face_bbox, gray=None):
+        """Extract features and health indicators for a face (runs on the analysis worker)"""
+        features = self.feature_extractor.extract_features_from_frame(frame, face_bbox, gray)
+        health_data = self.health_analyzer.analyze(features)
+        return face_bbox, features, health_data
+    
     def _draw_health_indicators(self, frame, face_bbox, health_data):
         """Draw health indicators on the frame for the primary face"""
         x, y, w, h = face_bbox
@@ -592,14 +609,14 @@ def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Real-time Facial Analysis with GPU Acceleration')
     parser.add_argument('--method', '-m', type=str, default='dlib',
-                      choices=['opencv', 'dlib'],
+                      choices=['opencv', 'yunet', 'dlib'],
                       help='Face detection method')
     # Use absolute path for output directory
     default_output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output')
     parser.add_argument('--output', '-o', type=str, default=default_output_dir,
                       help='Directory to save analysis results')
     parser.add_argument('--format', '-f', type=str, default='json',
-                      choices=['json', 'csv', 'xlsx'],
+                      choices=['json', 'csv', 'xlsx', 'blp', 'parquet'],
                       help='Output format for storage')
     parser.add_argument('--camera', '-c', type=int, default=0,
                       help='Camera ID (usually 0 for built-in webcam)')
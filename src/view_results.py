@@ -317,7 +317,7 @@ def main():
             if os.path.isfile(filepath) and (
                 'facial_analysis' in filename or 'complete_health_analysis' in filename):
                 ext = os.path.splitext(filename)[1].lower()
-                if ext in ['.json', '.csv', '.xlsx']:
+                if ext in ['.json', '.csv', '.xlsx', '.blp', '.parquet']:
                     result_files.append(filepath)
         
         # Sort by modification time (newest first)
@@ -0,0 +1,64 @@
+"""
+Regression tests for DataStorage tabular output
+"""
+
+import os
+import sys
+import csv
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from data_storage import DataStorage
+
+
+class TestNestedHealthValues(unittest.TestCase):
+    """Health values holding dicts or lists, as HealthAnalyzer produces"""
+
+    RESULTS = [
+        {
+            'timestamp': '20260101_120000',
+            'face_id': 1,
+            'health_analysis': {
+                'overall_score': 7.5,
+                'estimated_stress_level': {'value': 0.3, 'unit': 'index', 'note': 'estimate'},
+                'patterns': [{'name': 'fatigue', 'confidence': 0.4}]
+            }
+        },
+        {
+            'timestamp': '20260101_120001',
+            'face_id': 2,
+            'health_analysis': {'overall_score': 6.0}
+        }
+    ]
+
+    def test_save_csv_writes_nested_values_as_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_file = DataStorage().save(self.RESULTS, os.path.join(tmp, 'results'), 'csv')
+
+            with open(output_file, newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(len(rows), 2)
+        self.assertIn("'unit': 'index'", rows[0]['health_estimated_stress_level'])
+        self.assertIn("'name': 'fatigue'", rows[0]['health_patterns'])
+        self.assertEqual(rows[1]['health_estimated_stress_level'], '')
+
+    def test_real_time_csv_writes_nested_values_as_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = DataStorage()
+            storage.start_real_time_saving(tmp, 'csv', save_interval=1)
+            for result in self.RESULTS:
+                storage.queue_data_for_saving(result)
+            output_file = storage.stop_real_time_saving()
+
+            with open(output_file, newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(len(rows), 2)
+        self.assertIn("'value': 0.3", rows[0]['health_estimated_stress_level'])
+
+
+if __name__ == '__main__':
+    unittest.main()